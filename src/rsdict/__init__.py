@@ -1,9 +1,19 @@
 from .rsdict import (
+    MISSING,
     rsdict,
     rsdict_frozen,
     rsdict_unfix,
     rsdict_fixtype,
-    rsdict_fixkey
+    rsdict_fixkey,
+    rsdict_subtype,
+    rsdict_nested,
+    rsdict_template,
 )
+from .cast import get_converter, register_converter
+from .journal import rsdict_journal
+from .shared import rsdict_shared
+from .table import rsdict_table
+from .threadsafe import rsdict_concurrent, rsdict_view
+from .watch import rsdict_watch
 
 __version__ = "0.1.8"
@@ -0,0 +1,112 @@
+import functools
+from pathlib import PurePath
+from typing import Callable, Optional
+
+
+# strings converted to bool (case-insensitive)
+_TRUE_STRINGS = frozenset(["true", "yes", "on", "1"])
+_FALSE_STRINGS = frozenset(["false", "no", "off", "0"])
+
+
+def _str_to_bool(value: str) -> bool:
+    """Convert string to bool ("false" -> False)."""
+    lower = value.strip().lower()
+    if lower in _TRUE_STRINGS:
+        return True
+    elif lower in _FALSE_STRINGS:
+        return False
+    raise ValueError("invalid literal for bool: {!r}".format(value))
+
+
+# (source type, target type): converter
+# target type itself is used if not registered
+_CONVERTERS = {
+    (str, bool): _str_to_bool,
+    (str, int): int,
+    (str, float): float,
+}
+# (source type, target type): converter used by _cast()
+# (cleared when converters are registered)
+_RESOLVED = dict()
+# number of strings cached for each path type
+_PATH_CACHE_SIZE = 256
+
+
+def register_converter(
+    source: type,
+    target: type,
+    converter: Optional[Callable],
+) -> None:
+    """Register a converter used to cast values (if cast=True).
+
+    Converters from str to Path types should return
+    the same value for the same string, because the results are cached.
+
+    Args:
+        source (type): Type of values to cast.
+        target (type): Initial type.
+        converter (callable): Function to convert a value.
+            If None, the registered converter is removed
+            (and `target(value)` is used).
+
+    Examples:
+        >>> from rsdict import register_converter
+        >>> register_converter(str, list, lambda x: x.split(","))
+    """
+    if not isinstance(source, type) or not isinstance(target, type):
+        raise TypeError("source and target must be types")
+    if converter is None:
+        _CONVERTERS.pop((source, target), None)
+    elif not callable(converter):
+        raise TypeError("converter must be callable")
+    else:
+        _CONVERTERS[source, target] = converter
+    _RESOLVED.clear()
+
+
+def get_converter(source: type, target: type) -> Callable:
+    """Get the converter from source type to target type.
+
+    Returns:
+        callable: Registered converter, or target type.
+    """
+    return _CONVERTERS.get((source, target), target)
+
+
+def _resolve(source: type, target: type) -> Callable:
+    """Get the converter used by _cast()."""
+    converter = get_converter(source, target)
+    if source is str and issubclass(target, PurePath):
+        # parsing paths is slow, and config values are often repeated
+        converter = functools.lru_cache(maxsize=_PATH_CACHE_SIZE)(converter)
+    _RESOLVED[source, target] = converter
+    return converter
+
+
+def _cast(value, target: type):
+    """Cast the value to the target type.
+
+    Raises:
+        (Raised by the converter.)
+    """
+    try:
+        converter = _RESOLVED[type(value), target]
+    except KeyError:
+        converter = _resolve(type(value), target)
+    return converter(value)
+
+
+def _cast_items(items: dict, types: dict, skip=()) -> None:
+    """Cast values of different types in place.
+
+    Args:
+        items (dict): Values to cast.
+        types (dict): Target types of the keys.
+        skip (optional): Keys not cast (e.g. keys to be added).
+    """
+    for key, value in items.items():
+        if key in skip:
+            continue
+        target = types[key]
+        if type(value) is not target:
+            items[key] = _cast(value, target)
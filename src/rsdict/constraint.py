@@ -0,0 +1,93 @@
+import re
+from typing import Any, Callable, Optional
+
+
+# names of constraints: message of ValueError
+_MESSAGES = {
+    "min": "{!r} must be >= {!r}, {!r} found",
+    "max": "{!r} must be <= {!r}, {!r} found",
+    "choices": "{!r} must be one of {!r}, {!r} found",
+    "pattern": "{!r} must match {!r}, {!r} found",
+}
+
+# lines of the validator for each constraint (in order of checking)
+_LINES = {
+    "min": "    if value < min_: raise error(key, 'min', min_, value)",
+    "max": "    if value > max_: raise error(key, 'max', max_, value)",
+    "choices": (
+        "    if value not in choices: "
+        "raise error(key, 'choices', spec['choices'], value)"
+    ),
+    "pattern": (
+        "    if match(value) is None: "
+        "raise error(key, 'pattern', spec['pattern'], value)"
+    ),
+}
+
+
+def _error(key: Any, name: str, bound: Any, value: Any) -> ValueError:
+    """Create ValueError for the constraint."""
+    return ValueError(_MESSAGES[name].format(key, bound, value))
+
+
+def _compile(key: Any, spec: dict) -> Optional[Callable]:
+    """Compile constraints of the key into a validator.
+
+    Args:
+        key: Key of rsdict (used in error messages).
+        spec (dict): Constraints.
+            min, max: Range of values (inclusive).
+            choices (iterable): Allowed values.
+            pattern (str or re.Pattern): Regular expression
+                matching the whole string.
+
+    Returns:
+        callable: Function raising ValueError if the value is not valid,
+            or None if no constraints.
+
+    Raises:
+        TypeError: If spec is not a dict.
+        ValueError: If spec has unknown constraints.
+    """
+    if not isinstance(spec, dict):
+        raise TypeError(
+            "expected dict instance, {} found".format(type(spec).__name__))
+    unknown = spec.keys() - _LINES.keys()
+    if unknown:
+        raise ValueError("Unknown constraints: {}".format(sorted(unknown)))
+    if not spec:
+        return None
+
+    namespace = dict(key=key, spec=spec, error=_error)
+    if "min" in spec:
+        namespace["min_"] = spec["min"]
+    if "max" in spec:
+        namespace["max_"] = spec["max"]
+    if "choices" in spec:
+        try:
+            namespace["choices"] = frozenset(spec["choices"])
+        except TypeError:
+            # unhashable values
+            namespace["choices"] = tuple(spec["choices"])
+    if "pattern" in spec:
+        namespace["match"] = re.compile(spec["pattern"]).fullmatch
+
+    # one function without loops or branches for missing constraints
+    lines = ["def validate(value):"]
+    lines.extend(_LINES[name] for name in _LINES if name in spec)
+    exec("\n".join(lines), namespace)
+    return namespace["validate"]
+
+
+def _compile_all(constraints: dict) -> dict:
+    """Compile constraints of keys.
+
+    Returns:
+        dict: key: validator (keys without constraints are omitted).
+    """
+    validators = dict()
+    for key, spec in constraints.items():
+        validator = _compile(key, spec)
+        if validator is not None:
+            validators[key] = validator
+    return validators
@@ -0,0 +1,279 @@
+import gc
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+
+from .rsdict import (
+    MISSING,
+    _KT,
+    _SECTION_SIZE,
+    _check_instance,
+    rsdict,
+)
+
+
+def _encode_record(key: _KT, value, popped: bool = False) -> bytes:
+    """Encode a record of set (or delete if value is MISSING).
+
+    If popped, the key is removed by pop() (the initial key is kept).
+    """
+    if value is MISSING:
+        if popped:
+            data = pickle.dumps((key, MISSING), protocol=4)
+        else:
+            data = pickle.dumps((key,), protocol=4)
+    else:
+        if isinstance(value, rsdict):
+            value = value.to_dict()
+        data = pickle.dumps((key, value), protocol=4)
+    return _SECTION_SIZE.pack(len(data)) + data
+
+
+def _fsync_dir(path: Path) -> None:
+    """Write the directory entries to the disk (if supported)."""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        # directories cannot be opened (e.g. Windows)
+        return None
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_records(file) -> tuple:
+    """Read records of the journal file.
+
+    Returns:
+        tuple: (list of records, size of complete records).
+            An incomplete record at the end (interrupted writing)
+            is ignored.
+    """
+    with open(file, "rb") as f:
+        buffer = f.read()
+    records = list()
+    pos = 0
+    # pause garbage collection while many containers are created
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with memoryview(buffer) as view:
+            while pos + _SECTION_SIZE.size <= len(buffer):
+                size, = _SECTION_SIZE.unpack_from(view, pos)
+                end = pos + _SECTION_SIZE.size + size
+                if end > len(buffer):
+                    break
+                with view[pos + _SECTION_SIZE.size:end] as data:
+                    try:
+                        records.append(pickle.loads(data))
+                    except Exception:
+                        break
+                pos = end
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return records, pos
+
+
+class rsdict_journal(object):
+    """rsdict persisted with an append-only journal file.
+
+    Each set, added key and deleted key is appended to the journal,
+    and replayed when the journal is opened.
+    `compact()` saves the values to a snapshot file (`<file>.snapshot`)
+    and clears the journal.
+
+    Note:
+        Values changed in place (e.g. `list.append()`) are not recorded.
+        Set the value again to record it.
+        If a value cannot be pickled, the change is reverted
+        and the error is raised.
+
+    Warning:
+        Records and the snapshot are pickled, and replaying them
+        can execute arbitrary code. Open only journals you wrote.
+
+    Examples:
+        >>> from rsdict import rsdict_journal
+        >>> with rsdict_journal("config.journal", dict(foo=1)) as journal:
+        ...     journal.data["foo"] = 2
+        >>> rsdict_journal("config.journal", dict(foo=1)).data
+        rsdict({'foo': 2}, frozen=False, fixkey=True, fixtype=True, cast=False)
+    """
+    __slots__ = (
+        "__data",
+        "__path",
+        "__file",
+        "__sync",
+        "__records",
+        "__max_records",
+        "__hold",
+        "__reverting",
+    )
+
+    def __init__(
+        self,
+        file,
+        items: dict,
+        frozen: bool = False,
+        fixkey: bool = True,
+        fixtype: bool = True,
+        cast: bool = False,
+        sync: bool = False,
+        max_records: Optional[int] = None,
+    ) -> None:
+        """Open the journal and replay it.
+
+        Args:
+            file (str or Path): Path of the journal file.
+            items (dict): Initial items.
+                Ignored if the snapshot file exists.
+            frozen, fixkey, fixtype, cast (bool, optional):
+                Arguments of rsdict.
+                Ignored if the snapshot file exists.
+            sync (bool, optional): If True,
+                call `os.fsync()` after each record is written.
+            max_records (int, optional): If set,
+                compact the journal when the number of records exceeds it.
+        """
+        _check_instance(sync, int, classname="bool")
+        if max_records is not None:
+            _check_instance(max_records, int)
+        self.__path = Path(file)
+        self.__sync = bool(sync)
+        self.__max_records = max_records
+
+        snapshot = self.snapshot_path
+        if snapshot.exists():
+            data = rsdict.load(snapshot)
+        else:
+            data = rsdict(items, frozen, fixkey, fixtype, cast)
+
+        # replay journal
+        self.__records = 0
+        if self.__path.exists():
+            records, size = _read_records(self.__path)
+            for record in records:
+                if len(record) == 2:
+                    if record[1] is not MISSING:
+                        data[record[0]] = record[1]
+                    elif record[0] in data:
+                        # removed by pop()
+                        data.pop(record[0])
+                elif record[0] in data:
+                    del data[record[0]]
+            self.__records = len(records)
+            if size != self.__path.stat().st_size:
+                # remove incomplete record
+                with open(self.__path, "r+b") as f:
+                    f.truncate(size)
+
+        self.__data = data
+        self.__file = open(self.__path, "ab")
+        self.__hold = None
+        self.__reverting = False
+        data._add_listener(self.__record, before=True)
+        data._add_listener(self.__write)
+
+    @property
+    def data(self) -> rsdict:
+        """rsdict instance recorded to the journal."""
+        return self.__data
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Path of the snapshot file."""
+        return self.__path.with_name(self.__path.name + ".snapshot")
+
+    @property
+    def closed(self) -> bool:
+        return self.__file.closed
+
+    def __len__(self) -> int:
+        """Return number of records in the journal."""
+        return self.__records
+
+    def __enter__(self) -> "rsdict_journal":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __record(self, data: rsdict, keys) -> None:
+        """Record values before they are changed (to revert the change
+        if the records cannot be written)."""
+        if not self.__reverting:
+            # (kept if the previous change was not applied,
+            # e.g. validation failed, because the values are the same)
+            self.__hold = data._hold(keys, self.__hold)
+
+    def __write(self, data: rsdict, keys) -> None:
+        """Append records of changed keys.
+
+        If the values cannot be encoded, the change is reverted.
+        """
+        if self.__reverting:
+            return None
+        hold, self.__hold = self.__hold, None
+        initial = data.get_initial()
+        try:
+            records = b"".join(
+                _encode_record(
+                    key, dict.get(data, key, MISSING), key in initial)
+                for key in keys
+            )
+        except BaseException:
+            if hold is not None:
+                self.__reverting = True
+                try:
+                    data._revert(hold)
+                finally:
+                    self.__reverting = False
+            raise
+        if hold is not None:
+            data._release(hold)
+        f = self.__file
+        f.write(records)
+        f.flush()
+        if self.__sync:
+            os.fsync(f.fileno())
+        self.__records += len(keys)
+        if (self.__max_records is not None
+                and self.__records > self.__max_records):
+            self.compact()
+
+    def compact(self) -> None:
+        """Save values to the snapshot file and clear the journal.
+
+        If sync, the snapshot is written to the disk
+        before the journal is cleared.
+        """
+        snapshot = self.snapshot_path
+        tmp = snapshot.with_name(snapshot.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(self.__data.dumps())
+            if self.__sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(str(tmp), str(snapshot))
+        if self.__sync:
+            _fsync_dir(snapshot.parent)
+        # records are replaced by the snapshot
+        self.__file.seek(0)
+        self.__file.truncate()
+        if self.__sync:
+            os.fsync(self.__file.fileno())
+        self.__records = 0
+
+    def close(self) -> None:
+        """Stop recording and close the journal file."""
+        if self.__file.closed:
+            return None
+        self.__data._remove_listener(self.__record, before=True)
+        self.__data._remove_listener(self.__write)
+        if self.__hold is not None:
+            self.__data._release(self.__hold)
+            self.__hold = None
+        self.__file.close()
@@ -1,7 +1,21 @@
+import gc
+import os
 import sys
 import copy
-from collections import namedtuple
-from typing import Any, Optional, Union
+import mmap
+import pickle
+import struct
+import asyncio
+import itertools
+import contextlib
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import PurePath
+from typing import Any, Iterable, Optional, Union
+
+from .cast import _cast, _cast_items
+from .constraint import _compile_all
+from .watch import _Watcher
 
 
 _KT = Any
@@ -20,25 +34,364 @@ class _Raise(object):
         raise AttributeError("Cannot set attribute")
 
 
+_MISSING = object()
+
+
+class _Missing(object):
+    """Type of MISSING."""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+
+# placeholder of the value of added or removed key in rsdict.diff()
+MISSING = _Missing()
+
+# types of values which cannot be changed in place
+_IMMUTABLE_TYPES = frozenset(
+    [type(None), bool, int, float, complex, str, bytes])
+
+
+# containers copied shallowly if all items are immutable
+_FLAT_TYPES = frozenset([list, dict, set])
+
+
+def _is_immutable(value: _VT) -> bool:
+    """Return whether the value cannot be changed in place."""
+    return type(value) in _IMMUTABLE_TYPES or isinstance(value, PurePath)
+
+
+def _copy_value(value: _VT) -> _VT:
+    """Deepcopy the value unless it is immutable.
+
+    Containers of immutable values are copied shallowly.
+    """
+    if _is_immutable(value):
+        return value
+    elif type(value) in _FLAT_TYPES:
+        if type(value) is dict:
+            values = value.values()
+        else:
+            values = value
+        for v in values:
+            if type(v) not in _IMMUTABLE_TYPES:
+                break
+        else:
+            return value.copy()
+    return copy.deepcopy(value)
+
+
+def _reorder(d: dict, keys: list) -> None:
+    """Reorder keys of the dict in place (same set of keys).
+
+    Only keys out of order are moved to the end
+    (each of them is missing while it is moved).
+    """
+    # longest head of keys already in order
+    n = 0
+    for key in dict.keys(d):
+        if n < len(keys) and key == keys[n]:
+            n += 1
+    for key in keys[n:]:
+        _dict_setitem(d, key, dict.pop(d, key))
+
+
+class _ReadonlyDict(dict):
+    __slots__ = ()
+    __setitem__ = __delitem__ = _Raise.attribute_set
+    update = setdefault = pop = popitem = clear = _Raise.attribute_set
+
+
+# shared empty set and dict (replaced with new objects when used)
+_EMPTYSET = frozenset()
+_EMPTYDICT = _ReadonlyDict()
+
+
 class _Inititems(dict):
+    __slots__ = (
+        "_refs",
+        "_types",
+        "_mutables",
+        "_added",
+        "_removed",
+        "_verdicts",
+        "_constraints",
+        "_validators",
+    )
     update = setdefault = pop = popitem = _Raise.attribute
+    # types of mutable values shared with current values (not copied)
+    _shared = _EMPTYSET
 
     def __init__(self, items: dict) -> None:
-        return super().__init__(copy.deepcopy(items))
+        # number of rsdict instances sharing this object
+        self._refs = 1
+        # share immutable values, and deepcopy mutable values only
+        super().__init__(items)
+        # types of initial values
+        self._types = {key: type(value) for key, value in items.items()}
+        # keys of mutable values (may be changed in place)
+        self._mutables = _EMPTYSET
+        # keys added after initialized
+        self._added = _EMPTYSET
+        # key: original value of deleted key
+        self._removed = _EMPTYDICT
+        # (key, type): whether the type is a subclass of initial type
+        self._verdicts = _EMPTYDICT
+        # key: constraints of values (see constrain())
+        self._constraints = _EMPTYDICT
+        # key: compiled validator of constraints
+        self._validators = _EMPTYDICT
+        memo = dict()
+        for key, value in items.items():
+            if type(value) in _IMMUTABLE_TYPES:
+                continue
+            elif not _is_immutable(value):
+                if not self._mutables:
+                    self._mutables = set()
+                self._mutables.add(key)
+                if type(value) not in self._shared:
+                    super().__setitem__(key, copy.deepcopy(value, memo))
 
     def __setitem__(self, key: _KT, value: _VT) -> None:
         if key in self:
             # cannot change existing value
             _Raise.attribute_set()
-        return super().__setitem__(key, copy.deepcopy(value))
+        if not _is_immutable(value):
+            if not self._mutables:
+                self._mutables = set()
+            self._mutables.add(key)
+            value = copy.deepcopy(value)
+        self._types[key] = type(value)
+        if not self._added:
+            self._added = set()
+        self._added.add(key)
+        return super().__setitem__(key, value)
+
+    def __delitem__(self, key: _KT) -> None:
+        if key in self._mutables:
+            self._mutables.discard(key)
+        del self._types[key]
+        self._verdicts = _EMPTYDICT
+        if key in self._constraints:
+            del self._constraints[key]
+            if key in self._validators:
+                del self._validators[key]
+        self.__remove(key)
+        return super().__delitem__(key)
+
+    def clear(self) -> None:
+        for key in self:
+            self.__remove(key)
+        self._mutables = _EMPTYSET
+        self._types.clear()
+        self._verdicts = _EMPTYDICT
+        self._constraints = _EMPTYDICT
+        self._validators = _EMPTYDICT
+        return super().clear()
+
+    def __remove(self, key: _KT) -> None:
+        """Record the original value of the key to be deleted."""
+        if key in self._added:
+            self._added.discard(key)
+        else:
+            if not self._removed:
+                self._removed = dict()
+            self._removed[key] = self[key]
+
+    @classmethod
+    def load(
+        cls,
+        items: dict,
+        mutables: list,
+        added: list,
+        removed: dict,
+        constraints: Optional[dict] = None,
+    ) -> "_Inititems":
+        """Create _Inititems from loaded values without copying.
+
+        Loaded values are not validated with the constraints.
+        """
+        inititems = cls.__new__(cls)
+        inititems._refs = 1
+        inititems._types = {key: type(value) for key, value in items.items()}
+        inititems._mutables = set(mutables) or _EMPTYSET
+        inititems._added = set(added) or _EMPTYSET
+        inititems._removed = removed or _EMPTYDICT
+        inititems._verdicts = _EMPTYDICT
+        inititems._constraints = constraints or _EMPTYDICT
+        inititems._validators = _compile_all(constraints or {}) or _EMPTYDICT
+        dict.update(inititems, items)
+        return inititems
+
+    def copy_value(self, key: _KT) -> _VT:
+        """Copy the initial value to set as current value."""
+        value = self[key]
+        if type(value) in self._shared:
+            return value
+        return _copy_value(value)
+
+    def fork(self) -> "_Inititems":
+        """Create an unshared _Inititems with the same values.
+
+        Values are not copied, because initial values are never changed.
+        """
+        self._refs -= 1
+        inititems = self.__class__.__new__(self.__class__)
+        inititems._refs = 1
+        inititems._mutables = self._mutables.copy() or _EMPTYSET
+        inititems._types = self._types.copy()
+        inititems._added = self._added.copy() or _EMPTYSET
+        inititems._removed = self._removed.copy() or _EMPTYDICT
+        inititems._verdicts = self._verdicts.copy() or _EMPTYDICT
+        inititems._constraints = self._constraints.copy() or _EMPTYDICT
+        inititems._validators = self._validators.copy() or _EMPTYDICT
+        dict.update(inititems, self)
+        return inititems
+
+    def constrain(self, constraints: dict) -> None:
+        """Set constraints of values, and validate initial values.
+
+        Raises:
+            KeyError: If the key does not exist.
+            ValueError: If an initial value is not valid.
+        """
+        for key in constraints:
+            if key not in self:
+                raise KeyError(key)
+        validators = _compile_all(constraints)
+        for key, validator in validators.items():
+            validator(self[key])
+        self._constraints = dict(constraints)
+        self._validators = validators or _EMPTYDICT
+
+    def is_subtype(self, key: _KT, valuetype: type) -> bool:
+        """Return whether the type is a subclass of the initial type.
+
+        The result is cached for each key and type.
+        """
+        try:
+            return self._verdicts[key, valuetype]
+        except KeyError:
+            pass
+        verdict = issubclass(valuetype, self._types[key])
+        if not self._verdicts:
+            self._verdicts = dict()
+        self._verdicts[key, valuetype] = verdict
+        return verdict
+
+
+class _Transaction(object):
+    """Undo log of rsdict.transaction()."""
+    __slots__ = ("parent", "inititems", "setter", "log")
+
+    def __init__(
+        self,
+        parent: Optional["_Transaction"],
+        inititems: _Inititems,
+        setter,
+    ) -> None:
+        self.parent = parent
+        # initial items at the beginning
+        self.inititems = inititems
+        # __setitem__ outside the transaction
+        self.setter = setter
+        # key: (current value, whether key is assigned)
+        self.log = dict()
+
+
+class _NestedInititems(_Inititems):
+    """Initial items of rsdict_nested.
+
+    Nested dicts are not copied, because they are wrapped
+    (and initialized) as rsdict_nested instances when accessed.
+    """
+    __slots__ = ()
+    _shared = frozenset([dict])
+
+
+class _Snapshot(object):
+    """Values of rsdict stored as a delta from initial items."""
+    __slots__ = ("inititems", "values")
+
+    def __init__(self, inititems: _Inititems, values: dict) -> None:
+        # initial items when taken (forked if keys are added or deleted)
+        self.inititems = inititems
+        inititems._refs += 1
+        # changed values only
+        self.values = values
+
+    def drop(self) -> None:
+        """Release initial items."""
+        self.inititems._refs -= 1
+
+
+class _History(object):
+    """Named snapshots and undo/redo stacks of rsdict."""
+    __slots__ = ("snapshots", "undo", "redo")
+
+    def __init__(self) -> None:
+        # name: _Snapshot
+        self.snapshots = dict()
+        # list of _Snapshot
+        self.undo = list()
+        self.redo = list()
+
+
+class _Listeners(object):
+    """Functions called with changed keys of rsdict."""
+    __slots__ = ("before", "after", "watcher")
+
+    def __init__(self) -> None:
+        # called before values are changed
+        self.before = list()
+        # called after values are changed
+        self.after = list()
+        # _Watcher for asyncio
+        self.watcher = None
+
+
+class _Subscription(object):
+    """Callback of rsdict.subscribe()."""
+    __slots__ = ("func", "keys")
+
+    def __init__(self, func, keys: Optional[frozenset]) -> None:
+        self.func = func
+        self.keys = keys
+
+    def __call__(self, data, keys) -> None:
+        if self.keys is None:
+            keys = frozenset(keys)
+        else:
+            keys = self.keys.intersection(keys)
+            if not keys:
+                return None
+        self.func(data, keys)
 
 
 class _Options(
     namedtuple(
         "Options",
         ["frozen", "fixkey", "fixtype", "cast"])):
+    __slots__ = ()
     _make = _replace = _Raise.attribute
 
+    def __new__(cls, frozen, fixkey, fixtype, cast) -> "_Options":
+        """Return the shared instance for the same options."""
+        args = (frozen, fixkey, fixtype, cast)
+        try:
+            return _OPTIONS[args]
+        except KeyError:
+            options = _OPTIONS[args] = super().__new__(cls, *args)
+            return options
+
+
+# shared _Options instances
+_OPTIONS = dict()
+
 
 class _ErrorMessages(
     namedtuple(
@@ -93,6 +446,201 @@ def _check_instance(object, classinfo, classname: str = None) -> None:
         )
 
 
+_dict_setitem = dict.__setitem__
+# set attribute bypassing rsdict.__setattr__
+_setattr = object.__setattr__
+
+
+# header of files created by rsdict.save() (with format version)
+_FILE_HEADER = b"RSDICT\x00\x01"
+_SECTION_SIZE = struct.Struct("<Q")
+
+
+def _dump_sections(sections: tuple) -> bytes:
+    """Pickle objects with sizes."""
+    chunks = [_FILE_HEADER]
+    for section in sections:
+        data = pickle.dumps(section, protocol=4)
+        chunks.append(_SECTION_SIZE.pack(len(data)))
+        chunks.append(data)
+    return b"".join(chunks)
+
+
+def _load_sections(buffer, n: int) -> list:
+    """Unpickle objects dumped by _dump_sections() without copying buffer.
+
+    Raises:
+        ValueError: If the data is not dumped by rsdict, or truncated.
+    """
+    sections = list()
+    # pause garbage collection while many containers are created
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with memoryview(buffer) as view:
+            pos = len(_FILE_HEADER)
+            if view[:pos] != _FILE_HEADER:
+                raise ValueError("Not an rsdict data or unsupported version")
+            for _ in range(n):
+                if pos + _SECTION_SIZE.size > len(view):
+                    raise ValueError("rsdict data is truncated")
+                size, = _SECTION_SIZE.unpack_from(view, pos)
+                pos += _SECTION_SIZE.size
+                if pos + size > len(view):
+                    raise ValueError("rsdict data is truncated")
+                with view[pos:pos + size] as data:
+                    try:
+                        sections.append(pickle.loads(data))
+                    except (EOFError, pickle.UnpicklingError) as e:
+                        raise ValueError(
+                            "rsdict data is broken: {}".format(e)) from e
+                pos += size
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return sections
+
+
+def _read_sections(file, n: int, use_mmap: bool) -> list:
+    """Read objects written by _dump_sections() from the file."""
+    with open(file, "rb") as f:
+        if use_mmap:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+    try:
+        return _load_sections(buffer, n)
+    finally:
+        if use_mmap:
+            buffer.close()
+
+
+def _type_error(initialtype: type, value: _VT) -> TypeError:
+    """Create TypeError for fixtype."""
+    return TypeError(
+        "expected {} instance, {} found".format(
+            initialtype.__name__,
+            type(value).__name__,
+        )
+    )
+
+
+def _validate(
+    updates: dict,
+    types: dict,
+    options: _Options,
+    is_subtype=None,
+    validators: Optional[dict] = None,
+) -> set:
+    """Validate (and cast) values to update in place.
+
+    Args:
+        updates (dict): Values to update.
+        types (dict): Initial types of all keys.
+        options (_Options): Options of rsdict.
+        is_subtype (callable, optional): If set, values of subclasses
+            of initial types are allowed (see _Inititems.is_subtype).
+        validators (dict, optional): Validators of keys
+            called with values (after cast).
+
+    Returns:
+        set: Keys to be added.
+
+    Raises:
+        (Same as rsdict.__setitem__.)
+    """
+    if options.frozen:
+        raise AttributeError(_ERRORMESSAGES.frozen)
+    newkeys = updates.keys() - types.keys()
+    if newkeys and options.fixkey:
+        raise AttributeError(_ERRORMESSAGES.fixkey)
+    if options.fixtype:
+        skip = newkeys
+        if is_subtype is not None:
+            skip = newkeys | {
+                key for key, value in updates.items()
+                if key not in newkeys
+                and type(value) is not types[key]
+                and is_subtype(key, type(value))
+            }
+        if options.cast:
+            # raise if failed
+            _cast_items(updates, types, skip)
+        else:
+            for key, value in updates.items():
+                if key in skip:
+                    continue
+                initialtype = types[key]
+                if type(value) is not initialtype:
+                    raise _type_error(initialtype, value)
+    if validators:
+        for key in updates.keys() & validators.keys():
+            validators[key](updates[key])
+    return newkeys
+
+
+# token of validate_many() call: compiled validators
+# (cached in each worker process)
+_WORKER_VALIDATORS = dict()
+_WORKER_TOKENS = itertools.count()
+
+
+def _validate_chunk(
+    items: list,
+    types: dict,
+    options: _Options,
+    constraints: dict,
+    token: int,
+) -> list:
+    """Validate dicts (called in worker processes of validate_many()).
+
+    Validators are compiled once in each worker process,
+    because compiled validators cannot be pickled.
+
+    Returns:
+        list: Validated dict or raised exception of each item.
+    """
+    validators = _WORKER_VALIDATORS.get(token)
+    if validators is None:
+        # workers are not shared by calls
+        _WORKER_VALIDATORS.clear()
+        validators = _WORKER_VALIDATORS[token] = _compile_all(constraints)
+    return _validate_items(items, types, options, validators)
+
+
+def _validate_items(
+    items: list,
+    types: dict,
+    options: _Options,
+    validators: dict,
+) -> list:
+    """Validate dicts in the same way as rsdict.update().
+
+    Returns:
+        list: Validated dict or raised exception of each item.
+    """
+    results = list()
+    for item in items:
+        try:
+            if not isinstance(item, dict):
+                raise TypeError(
+                    "expected dict instance, {} found".format(
+                        type(item).__name__))
+            updates = dict(item)
+            if updates:
+                _validate(updates, types, options, None, validators)
+        except Exception as e:
+            results.append(e)
+        else:
+            results.append(updates)
+    return results
+
+
+def _restore(cls: type, sections: tuple) -> "rsdict":
+    """Unpickle rsdict instance (see rsdict.__reduce__)."""
+    return cls._rsdict__from_sections(sections)
+
+
 class rsdict(dict):
     """Restricted and resetable dictionary,
     a subclass of Python dict (built-in dictionary).
@@ -101,6 +649,23 @@ class rsdict(dict):
         >>> from rsdict import rsdict
         >>> rd = rsdict(dict(foo=1, bar="baz"))
     """
+    __slots__ = (
+        "__options",
+        "__setter",
+        "__changed",
+        "__txn",
+        "__history",
+        "__listeners",
+        "__types",
+        "__inititems",
+        "__weakref__",
+    )
+    _inititems_class = _Inititems
+    # allow values of subclasses of initial types (if fixtype)
+    _subtype = False
+    # restore order of keys after rollback and restore()
+    # (keys out of order are deleted and added again)
+    _keep_order = True
 
     def __init__(
         self,
@@ -109,6 +674,7 @@ class rsdict(dict):
         fixkey: bool = True,
         fixtype: bool = True,
         cast: bool = False,
+        constraints: Optional[dict] = None,
     ) -> None:
         """Initialize rsdict instance
         with data(dict) and optional arguments(bool).
@@ -125,6 +691,11 @@ class rsdict(dict):
             cast (bool, optional): If False,
                 cast to initial type (if possible).
                 If True, allow only the same type of initial value.
+            constraints (dict, optional): Constraints of values of keys.
+                key: dict of constraints
+                (min, max, choices and pattern).
+                Values set (after cast) must satisfy them,
+                otherwise ValueError is raised.
 
         Examples:
             >>> rd = rsdict(
@@ -144,9 +715,11 @@ class rsdict(dict):
         _check_instance(fixkey, int, classname="bool")
         _check_instance(fixtype, int, classname="bool")
         _check_instance(cast, int, classname="bool")
+        if constraints is not None:
+            _check_instance(constraints, dict)
 
         # create Options object
-        self.__options = _Options(
+        options = _Options(
             frozen=bool(frozen),
             fixkey=bool(fixkey),
             fixtype=bool(fixtype),
@@ -154,13 +727,39 @@ class rsdict(dict):
         )
 
         # store initial values in __inititems
-        # NOTE: Cannot deepcopy restdict
+        # (current values of rsdict are used as initial values)
         if type(items) is type(self):
             items = items.to_dict()
-        self.__inititems = _Inititems(items)
+        inititems = self._inititems_class(items)
+        if constraints:
+            inititems.constrain(constraints)
+        self.__setup(options, inititems, set())
 
         return super().__init__(items)
 
+    def __setup(
+        self,
+        options: _Options,
+        inititems: _Inititems,
+        changed: set,
+    ) -> None:
+        """Set attributes of new instance."""
+        _setattr(self, "_rsdict__options", options)
+        # keys assigned after initialized or reset
+        # (may be changed from initial)
+        _setattr(self, "_rsdict__changed", changed or _EMPTYSET)
+        # undo log of the current transaction
+        _setattr(self, "_rsdict__txn", None)
+        # snapshots (created when first used)
+        _setattr(self, "_rsdict__history", None)
+        # functions called with changed keys (created when first used)
+        _setattr(self, "_rsdict__listeners", None)
+        # types of initial values (shared with __inititems)
+        _setattr(self, "_rsdict__types", inititems._types)
+        _setattr(self, "_rsdict__inititems", inititems)
+        # bind __setitem__ specialized for options
+        _setattr(self, "_rsdict__setter", self.__select_setter())
+
     @property
     def frozen(self) -> bool:
         return self.__options.frozen
@@ -177,23 +776,188 @@ class rsdict(dict):
     def cast(self) -> bool:
         return self.__options.cast
 
-    @_check_option("fixkey")
+    def __fork_initial(self) -> None:
+        """Unshare initial items before adding or deleting keys."""
+        if self.__inititems._refs > 1:
+            inititems = self.__inititems.fork()
+            _setattr(self, "_rsdict__inititems", inititems)
+            _setattr(self, "_rsdict__types", inititems._types)
+
+    def __assigned(self) -> set:
+        """Get the set of assigned keys (created when first used)."""
+        if self.__changed is _EMPTYSET:
+            _setattr(self, "_rsdict__changed", set())
+        return self.__changed
+
     def __addkey(self, key: _KT, value: _VT) -> None:
         """Add a new key to instance."""
+        if self.__options.fixkey:
+            raise AttributeError(_ERRORMESSAGES.fixkey)
+        if self.__txn is not None or self.__listeners is not None:
+            self.__log((key,))
+        self.__fork_initial()
         # add initial key
         self.__inititems[key] = value
         # add current key
-        return super().__setitem__(key, value)
+        return dict.__setitem__(self, key, value)
 
-    @_check_option("fixkey")
     def __delkey(self, key: _KT) -> None:
         """Delete a key from instance."""
+        if self.__options.fixkey:
+            raise AttributeError(_ERRORMESSAGES.fixkey)
+        if key not in self:
+            raise KeyError(key)
+        if self.__txn is not None or self.__listeners is not None:
+            self.__log((key,))
+        self.__fork_initial()
         # delete initial key
         del self.__inititems[key]
+        if key in self.__changed:
+            self.__changed.discard(key)
         # delete current key
-        return super().__delitem__(key)
+        return dict.__delitem__(self, key)
+
+    def __popkey(self, key: _KT) -> None:
+        """Delete a current key (the initial key is kept)."""
+        if self.__txn is not None or self.__listeners is not None:
+            self.__log((key,))
+        dict.__delitem__(self, key)
+        self.__assigned().add(key)
+
+    # __setitem__ specialized for options
+
+    def __set_frozen(self, key: _KT, value: _VT) -> None:
+        raise AttributeError(_ERRORMESSAGES.frozen)
+
+    def __set_unfixtype(self, key: _KT, value: _VT) -> None:
+        if key not in self:
+            # add a new key
+            return self.__addkey(key, value)
+        _dict_setitem(self, key, value)
+        try:
+            self.__changed.add(key)
+        except AttributeError:
+            # first assignment
+            self.__assigned().add(key)
+
+    def __set_fixtype(self, key: _KT, value: _VT) -> None:
+        if key not in self:
+            # add a new key
+            return self.__addkey(key, value)
+        initialtype = self.__types[key]
+        if type(value) is not initialtype:
+            raise _type_error(initialtype, value)
+        _dict_setitem(self, key, value)
+        try:
+            self.__changed.add(key)
+        except AttributeError:
+            # first assignment
+            self.__assigned().add(key)
+
+    def __set_cast(self, key: _KT, value: _VT) -> None:
+        if key not in self:
+            # add a new key
+            return self.__addkey(key, value)
+        initialtype = self.__types[key]
+        if type(value) is not initialtype:
+            # raise if failed
+            value = _cast(value, initialtype)
+        _dict_setitem(self, key, value)
+        try:
+            self.__changed.add(key)
+        except AttributeError:
+            # first assignment
+            self.__assigned().add(key)
+
+    def __set_subtype(self, key: _KT, value: _VT) -> None:
+        if key not in self:
+            # add a new key
+            return self.__addkey(key, value)
+        initialtype = self.__types[key]
+        valuetype = type(value)
+        if (valuetype is not initialtype
+                and not self.__inititems.is_subtype(key, valuetype)):
+            if not self.__options.cast:
+                raise _type_error(initialtype, value)
+            # raise if failed
+            value = _cast(value, initialtype)
+        _dict_setitem(self, key, value)
+        try:
+            self.__changed.add(key)
+        except AttributeError:
+            # first assignment
+            self.__assigned().add(key)
+
+    @classmethod
+    def __get_setter(cls, options: _Options):
+        """Select __setitem__ specialized for options."""
+        if options.frozen:
+            return rsdict.__set_frozen
+        elif not options.fixtype:
+            return rsdict.__set_unfixtype
+        elif cls._subtype:
+            return rsdict.__set_subtype
+        elif options.cast:
+            return rsdict.__set_cast
+        else:
+            return rsdict.__set_fixtype
+
+    def __set_validated(self, key: _KT, value: _VT) -> None:
+        """__setitem__ with validators of keys (if not frozen)."""
+        if key not in self:
+            # add a new key
+            return self.__addkey(key, value)
+        if type(value) is not self.__types[key]:
+            value = self.__check_type(key, value)
+        validator = self.__inititems._validators.get(key)
+        if validator is not None:
+            # raise if not valid
+            validator(value)
+        _dict_setitem(self, key, value)
+        try:
+            self.__changed.add(key)
+        except AttributeError:
+            # first assignment
+            self.__assigned().add(key)
+
+    def __check_type(self, key: _KT, value: _VT) -> _VT:
+        """Validate (and cast) value of different type from initial."""
+        options = self.__options
+        if not options.fixtype:
+            return value
+        if self._subtype and self.__inititems.is_subtype(key, type(value)):
+            return value
+        initialtype = self.__types[key]
+        if not options.cast:
+            raise _type_error(initialtype, value)
+        # raise if failed
+        return _cast(value, initialtype)
+
+    def __select_setter(self):
+        """Select __setitem__ for options and validators."""
+        options = self.__options
+        if self.__inititems._validators and not options.frozen:
+            return rsdict.__set_validated
+        return self.__get_setter(options)
+
+    def __get_subtype_check(self):
+        """Get function to check subclasses (None if not allowed)."""
+        if self._subtype:
+            return self.__inititems.is_subtype
+        return None
+
+    def __set_notified(self, key: _KT, value: _VT) -> None:
+        """__setitem__ with listeners."""
+        if self.__listeners.before:
+            self.__log((key,))
+        self.__select_setter()(self, key, value)
+        self.__notify((key,))
+
+    def __set_logged(self, key: _KT, value: _VT) -> None:
+        """__setitem__ in transaction."""
+        self.__log((key,))
+        return self.__txn.setter(self, key, value)
 
-    @_check_option("frozen")
     def __setitem__(self, key: _KT, value: _VT) -> None:
         """Set value with key.
 
@@ -204,32 +968,15 @@ class rsdict(dict):
                 and type(value)!=type(initial_value).
             ValueError: If fixtype and failed in casting.
         """
-        if key in self:
-            initialtype = type(self.get_initial(key))
-            if type(value) is initialtype:
-                # type(value) is same as type(initial value)
-                pass
-            elif self.fixtype:
-                if self.cast:
-                    # raise if failed
-                    value = initialtype(value)
-                else:
-                    raise TypeError(
-                        "expected {} instance, {} found".format(
-                            initialtype.__name__,
-                            type(value).__name__,
-                        )
-                    )
-            # change value
-            return super().__setitem__(key, value)
-        else:
-            # add a new key
-            return self.__addkey(key, value)
+        return self.__setter(self, key, value)
 
-    @_check_option("frozen")
     def __delitem__(self, key: _KT) -> None:
         """Cannot delete if fixkey or frozen."""
-        return self.__delkey(key)
+        if self.__options.frozen:
+            raise AttributeError(_ERRORMESSAGES.frozen)
+        self.__delkey(key)
+        if self.__listeners is not None:
+            self.__notify((key,))
 
     # def __getattribute__(self, name: str) -> Any:
     #     print("__getattribute__", name)
@@ -238,14 +985,10 @@ class rsdict(dict):
     def __setattr__(self, name: str, value: Any) -> None:
         try:
             _ = self.__inititems
-        except Exception:
-            pass
-        else:
-            if name in dir(self) and not name.startswith("_rsdict__"):
-                pass
-            else:
-                _Raise.attribute_set()
-        return super().__setattr__(name, value)
+        except AttributeError:
+            # not initialized
+            return super().__setattr__(name, value)
+        _Raise.attribute_set()
 
     def __sizeof__(self) -> int:
         """Return size(current values) + size(initial values)"""
@@ -253,6 +996,7 @@ class rsdict(dict):
         size = super().__sizeof__()
         # initial values
         size += self.get_initial().__sizeof__()
+        size += self.__changed.__sizeof__()
         size += self.frozen.__sizeof__()
         size += self.fixkey.__sizeof__()
         size += self.fixtype.__sizeof__()
@@ -278,14 +1022,18 @@ class rsdict(dict):
         @_check_option("frozen")
         def __ior__(self, other) -> dict:
             if set(self.keys()) == set(self.keys() | other.keys()):
-                return super().__ior__(other)
+                pass
             elif self.fixkey:
                 raise AttributeError(_ERRORMESSAGES.fixkey)
             else:
                 newkeys = (other.keys() | self.keys()) - self.keys()
                 for key in newkeys:
                     self.__addkey(key, other[key])
-                return super().__ior__(other)
+            self.__log(other.keys())
+            result = super().__ior__(other)
+            self.__assigned().update(other.keys())
+            self.__notify(other.keys())
+            return result
 
         # def __ror__(self, other):
         #     return super().__ror__(other)
@@ -332,57 +1080,278 @@ class rsdict(dict):
             If the values are changed and copy with
             `reset=False, frozen=True` option,
             current values are copied as initial values and frozen.
+            Otherwise, initial values are shared with the new instance
+            until keys are added or deleted.
         """
-        if frozen is None:
-            frozen = self.frozen
-        if fixkey is None:
-            fixkey = self.fixkey
-        if fixtype is None:
-            fixtype = self.fixtype
-        if cast is None:
-            cast = self.cast
-
         _check_instance(reset, int, classname="bool")
-        _check_instance(frozen, int, classname="bool")
-        if not reset and frozen:
-            # initialize with current values
-            items = self.to_dict().copy()
+        if (frozen is None and fixkey is None
+                and fixtype is None and cast is None):
+            options = self.__options
         else:
-            # initialize with initial values
-            items = self.get_initial()
+            if frozen is None:
+                frozen = self.frozen
+            if fixkey is None:
+                fixkey = self.fixkey
+            if fixtype is None:
+                fixtype = self.fixtype
+            if cast is None:
+                cast = self.cast
+            _check_instance(frozen, int, classname="bool")
+            _check_instance(fixkey, int, classname="bool")
+            _check_instance(fixtype, int, classname="bool")
+            _check_instance(cast, int, classname="bool")
+            options = _Options(
+                frozen=bool(frozen),
+                fixkey=bool(fixkey),
+                fixtype=bool(fixtype),
+                cast=bool(cast),
+            )
 
-        # create new instance
-        rdnew = self.__class__(
-            items=items,
-            frozen=frozen,
-            fixkey=fixkey,
-            fixtype=fixtype,
-            cast=cast,
-        )
+        if not reset and options.frozen:
+            # initialize with current values
+            kwargs = options._asdict()
+            if self.__inititems._constraints:
+                # (subclasses without constraints may not accept it)
+                kwargs["constraints"] = dict(self.__inititems._constraints)
+            return self.__class__(items=self.to_dict(), **kwargs)
 
-        if reset or frozen:
+        if reset:
             # no need to copy current values
-            pass
-        # elif self.is_changed():
+            changed = set()
         else:
+            changed = self.changed_keys()
+        # validate current values if options are changed
+        validate = options != self.__options
+
+        # share initial values
+        inititems = self.__inititems
+        items = dict(inititems)
+        for key in inititems._mutables - changed:
+            items[key] = inititems.copy_value(key)
+        if not validate:
+            for key in changed:
+                items[key] = dict.get(self, key, MISSING)
+        # keys removed by pop()
+        popped = [key for key in changed if key not in self]
+        for key in popped:
+            del items[key]
+
+        # create new instance
+        rdnew = self.__class__.__new__(self.__class__)
+        inititems._refs += 1
+        rdnew.__setup(options, inititems, set() if validate else changed)
+        dict.update(rdnew, items)
+
+        if validate:
             # copy current values
-            for key in self:
-                if self.is_changed(key):
+            for key in changed:
+                if key in self:
                     rdnew[key] = self[key]
+            rdnew.__assigned().update(popped)
+        return rdnew
+
+    def save(self, file) -> None:
+        """Save initial values, current values and options
+        to a binary file.
+
+        Current values are saved if changed from initial.
+
+        Args:
+            file (str or Path): Path of the file.
+        """
+        with open(file, "wb") as f:
+            f.write(self.dumps())
+
+    def dumps(self) -> bytes:
+        """Get initial values, current values and options as bytes
+        (same format as save()).
+
+        Returns:
+            bytes: Data to be loaded by loads().
+        """
+        meta, items, values = self.__sections()
+        inititems = self.__inititems
+        return _dump_sections((
+            meta,
+            items,
+            # mutable initial values (loaded as current values)
+            {key: inititems[key] for key in meta[2]},
+            values,
+        ))
+
+    def __sections(self) -> tuple:
+        """Get (meta, initial items, changed current values)."""
+        inititems = self.__inititems
+        if inititems._shared:
+            mutables = [
+                key for key in inititems._mutables
+                if type(inititems[key]) not in inititems._shared
+            ]
+        else:
+            mutables = list(inititems._mutables)
+        changed = self.changed_keys()
+        values = dict()
+        for key in changed:
+            # (MISSING if removed by pop())
+            value = dict.get(self, key, MISSING)
+            if isinstance(value, rsdict):
+                value = value.to_dict()
+            values[key] = value
+        meta = (
+            tuple(self.__options),
+            list(changed),
+            mutables,
+            list(inititems._added),
+            dict(inititems._removed),
+        )
+        if inititems._constraints:
+            # optional (not in data saved without constraints)
+            meta += (dict(inititems._constraints),)
+        return meta, dict(inititems), values
+
+    def __reduce__(self) -> tuple:
+        """Pickle initial items once and changed current values only.
+
+        Unpickled instance is not validated again.
+        Listeners, snapshots and undo history are not pickled.
+        """
+        meta, items, values = self.__sections()
+        # mutable current values are copied from initial values
+        # when unpickled (not pickled twice)
+        return _restore, (self.__class__, (meta, items, None, values))
+
+    def __deepcopy__(self, memo: dict) -> "rsdict":
+        """Deepcopy changed current values.
+
+        Initial values are shared with the new instance
+        (same as copy()), because they are never changed.
+        """
+        inititems = self.__inititems
+        changed = self.changed_keys()
+        items = dict(inititems)
+        for key in inititems._mutables - changed:
+            items[key] = inititems.copy_value(key)
+
+        rdnew = self.__class__.__new__(self.__class__)
+        memo[id(self)] = rdnew
+        inititems._refs += 1
+        rdnew.__setup(self.__options, inititems, changed)
+        dict.update(rdnew, items)
+        for key in changed:
+            if key in self:
+                value = dict.__getitem__(self, key)
+                _dict_setitem(rdnew, key, copy.deepcopy(value, memo))
+            else:
+                # removed by pop()
+                dict.__delitem__(rdnew, key)
         return rdnew
 
+    @classmethod
+    def load(cls, file, mmap: bool = False) -> "rsdict":
+        """Load rsdict instance from a file created by save().
+
+        Initial values are not copied (mutable values are loaded twice).
+
+        Args:
+            file (str or Path): Path of the file.
+            mmap (bool, optional): If True, the file is memory-mapped
+                instead of being read into memory.
+
+        Returns:
+            rsdict: New instance.
+
+        Raises:
+            ValueError: If the file is not created by save().
+
+        Warning:
+            Values are stored with pickle, and loading them
+            can execute arbitrary code. Never load untrusted files.
+        """
+        _check_instance(mmap, int, classname="bool")
+        return cls.__from_sections(_read_sections(file, 4, bool(mmap)))
+
+    @classmethod
+    def loads(cls, data) -> "rsdict":
+        """Load rsdict instance from bytes created by dumps().
+
+        Args:
+            data (bytes-like): Data created by dumps().
+                The buffer is not copied.
+
+        Returns:
+            rsdict: New instance.
+
+        Raises:
+            ValueError: If the data is not created by dumps().
+
+        Warning:
+            The data is unpickled. Never load data from untrusted sources.
+        """
+        return cls.__from_sections(_load_sections(data, 4))
+
+    @classmethod
+    def __from_sections(cls, sections: list) -> "rsdict":
+        """Create rsdict instance from loaded sections."""
+        meta, items, mutable_values, values = sections
+        options, changed, mutables, added, removed = meta[:5]
+        constraints = meta[5] if len(meta) > 5 else None
+        inititems = cls._inititems_class.load(
+            items, mutables, added, removed, constraints)
+        if mutable_values is None:
+            # copy mutable initial values at once
+            # (they are picklable, because they are unpickled)
+            mutable_values = _load_sections(_dump_sections(
+                [{key: items[key] for key in mutables}]), 1)[0]
+        rd = cls.__new__(cls)
+        rd.__setup(_Options(*options), inititems, set(changed))
+        dict.update(rd, items)
+        dict.update(rd, mutable_values)
+        dict.update(rd, values)
+        for key, value in values.items():
+            if value is MISSING:
+                # removed by pop()
+                dict.__delitem__(rd, key)
+        return rd
+
     def update(self, *args, **kwargs) -> None:
+        """Update values with all-or-nothing validation.
+
+        All values are validated (and cast) before any value is changed.
+
+        Raises:
+            (Same as __setitem__.)
+        """
         updates = dict(*args, **kwargs)
-        for key, value in updates.items():
-            self[key] = value
+        if not updates:
+            return None
+        newkeys = _validate(
+            updates,
+            self.__types,
+            self.__options,
+            self.__get_subtype_check(),
+            self.__inititems._validators,
+        )
+
+        # commit
+        self.__log(updates.keys())
+        for key in newkeys:
+            self.__addkey(key, updates[key])
+        dict.update(self, updates)
+        self.__assigned().update(updates.keys() - newkeys)
+        self.__notify(updates.keys())
 
     @_check_option("frozen")
     @_check_option("fixkey")
     def clear(self) -> None:
+        keys = list(self)
+        self.__log(keys)
         # clear initial key
+        self.__fork_initial()
         self.__inititems.clear()
+        _setattr(self, "_rsdict__changed", _EMPTYSET)
         # clear current key
-        return super().clear()
+        super().clear()
+        self.__notify(keys)
 
     def setdefault(self, key: _KT, value: _VT = None) -> _VT:
         if key in self:
@@ -394,12 +1363,29 @@ class rsdict(dict):
     @_check_option("frozen")
     @_check_option("fixkey")
     def pop(self, key: _KT) -> _VT:
-        return super().pop(key)
+        """Remove the key and return the value.
+
+        The initial value is kept (so `is_changed()` is True).
+        """
+        value = self[key]
+        self.__popkey(key)
+        self.__notify((key,))
+        return value
 
     @_check_option("frozen")
     @_check_option("fixkey")
     def popitem(self) -> tuple:
-        return super().popitem()
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        # find the last key and log it before deleting
+        if sys.version_info >= (3, 8):
+            key = next(reversed(self))
+        else:
+            key = list(self)[-1]
+        value = self[key]
+        self.__popkey(key)
+        self.__notify((key,))
+        return key, value
 
     @classmethod
     def fromkeys(cls, keys: _KT, value: _VT = None) -> "rsdict":
@@ -411,19 +1397,29 @@ class rsdict(dict):
         Args:
             key (optional): If None, reset all values.
         """
-        if not self.is_changed():
-            return None
         if key is None:
-            items_init = self.get_initial()
-            if self.keys() != items_init.keys():
+            if len(self) != len(self.__inititems):
                 raise UnboundLocalError(
                     "Current and initial keys do not match"
                 )
+            keys = self.changed_keys()
+        elif key not in self:
+            # add the initial key again
+            return self.__setitem__(key, self.get_initial(key))
+        elif self.is_changed(key):
+            keys = (key,)
         else:
-            value = self.get_initial(key)
-            items_init = {key: value}
-        for k, v in items_init.items():
-            self[k] = v
+            return None
+        if keys and self.frozen:
+            raise AttributeError(_ERRORMESSAGES.frozen)
+        self.__log(keys)
+        for k in keys:
+            super().__setitem__(k, self.__inititems.copy_value(k))
+        if key is None:
+            _setattr(self, "_rsdict__changed", _EMPTYSET)
+        elif key in self.__changed:
+            self.__changed.discard(key)
+        self.__notify(keys)
 
     def reset_all(self) -> None:
         """Alias of reset()."""
@@ -444,6 +1440,527 @@ class rsdict(dict):
         else:
             return self.__inititems[key]
 
+    @contextlib.contextmanager
+    def transaction(self):
+        """Context manager to change values atomically.
+
+        If an exception is raised in the block,
+        the values and keys changed in the block are restored
+        (values changed in place are not).
+        Transactions can be nested.
+
+        Examples:
+            >>> with rd.transaction():
+            ...     rd["foo"] = 2
+            ...     rd["bar"] = "qux"
+        """
+        txn = self.__begin()
+        try:
+            yield self
+        except BaseException:
+            self.__rollback(txn)
+            raise
+        else:
+            self.__commit(txn)
+
+    def __begin(self) -> "_Transaction":
+        """Start a transaction."""
+        parent = self.__txn
+        if parent is None:
+            setter = self.__setter
+        else:
+            setter = parent.setter
+        # keep initial items (forked if keys are added or deleted)
+        inititems = self.__inititems
+        inititems._refs += 1
+        txn = _Transaction(parent, inititems, setter)
+        _setattr(self, "_rsdict__txn", txn)
+        _setattr(self, "_rsdict__setter", rsdict.__set_logged)
+        return txn
+
+    def __end(self, txn: "_Transaction") -> None:
+        """Finish a transaction."""
+        _setattr(self, "_rsdict__txn", txn.parent)
+        if txn.parent is None:
+            _setattr(self, "_rsdict__setter", txn.setter)
+
+    def __bind_setter(self, setter) -> None:
+        """Set __setitem__ (restored after transactions)."""
+        txn = self.__txn
+        if txn is None:
+            _setattr(self, "_rsdict__setter", setter)
+        while txn is not None:
+            txn.setter = setter
+            txn = txn.parent
+
+    def __commit(self, txn: "_Transaction") -> None:
+        txn.inititems._refs -= 1
+        if txn.parent is not None:
+            # merge undo log into parent
+            for key, state in txn.log.items():
+                txn.parent.log.setdefault(key, state)
+        self.__end(txn)
+
+    def __rollback(self, txn: "_Transaction") -> None:
+        self.__undo(txn)
+        self.__end(txn)
+        self.__notify(txn.log.keys())
+
+    def __undo(self, txn: "_Transaction") -> None:
+        """Restore keys and values recorded in the undo log."""
+        self.__log(txn.log.keys())
+        if self.__inititems is txn.inititems:
+            txn.inititems._refs -= 1
+            reorder = False
+        else:
+            # keys are added or deleted
+            _setattr(self, "_rsdict__inititems", txn.inititems)
+            _setattr(self, "_rsdict__types", txn.inititems._types)
+            reorder = True
+        for key, (value, changed) in txn.log.items():
+            if value is _MISSING:
+                dict.pop(self, key, None)
+            else:
+                _dict_setitem(self, key, value)
+            if changed:
+                self.__assigned().add(key)
+            elif key in self.__changed:
+                self.__changed.discard(key)
+        if reorder and self._keep_order:
+            # restore order of keys
+            _reorder(self, [key for key in self.__inititems if key in self])
+
+    def __log(self, keys) -> None:
+        """Record current values of keys for rollback,
+        and call listeners before values are changed."""
+        listeners = self.__listeners
+        if listeners is not None and listeners.before:
+            for func in tuple(listeners.before):
+                func(self, keys)
+        txn = self.__txn
+        if txn is None:
+            return None
+        log = txn.log
+        for key in keys:
+            if key not in log:
+                log[key] = (dict.get(self, key, _MISSING),
+                            key in self.__changed)
+
+    def snapshot(self, name: _KT) -> None:
+        """Save current values as a named snapshot.
+
+        Only values changed from initial are stored.
+
+        Args:
+            name: Name of the snapshot. Overwritten if it exists.
+        """
+        history = self.__get_history()
+        old = history.snapshots.get(name)
+        history.snapshots[name] = self.__take()
+        if old is not None:
+            old.drop()
+
+    def restore(self, name: _KT) -> None:
+        """Restore values (and keys) of the named snapshot.
+
+        The current values are pushed to the undo stack.
+
+        Raises:
+            KeyError: If the snapshot does not exist.
+            AttributeError: If frozen and values are changed.
+        """
+        history = self.__get_history()
+        snapshot = history.snapshots[name]
+        self.checkpoint()
+        try:
+            self.__restore(snapshot)
+        except AttributeError:
+            history.undo.pop().drop()
+            raise
+
+    def delete_snapshot(self, name: _KT) -> None:
+        """Delete the named snapshot.
+
+        Raises:
+            KeyError: If the snapshot does not exist.
+        """
+        self.__get_history().snapshots.pop(name).drop()
+
+    def snapshots(self) -> list:
+        """Get names of snapshots.
+
+        Returns:
+            list: Names of snapshots.
+        """
+        return list(self.__get_history().snapshots)
+
+    def checkpoint(self) -> None:
+        """Push current values to the undo stack.
+
+        The redo stack is cleared.
+        """
+        history = self.__get_history()
+        history.undo.append(self.__take())
+        for snapshot in history.redo:
+            snapshot.drop()
+        history.redo.clear()
+
+    def undo(self) -> None:
+        """Restore values of the last checkpoint.
+
+        Raises:
+            IndexError: If the undo stack is empty.
+        """
+        history = self.__get_history()
+        if not history.undo:
+            raise IndexError("Nothing to undo")
+        self.__move(history.undo, history.redo)
+
+    def redo(self) -> None:
+        """Restore values undone by undo().
+
+        Raises:
+            IndexError: If the redo stack is empty.
+        """
+        history = self.__get_history()
+        if not history.redo:
+            raise IndexError("Nothing to redo")
+        self.__move(history.redo, history.undo)
+
+    def __move(self, src: list, dst: list) -> None:
+        """Restore the last snapshot of src and push current values to dst."""
+        current = self.__take()
+        try:
+            self.__restore(src[-1])
+        except AttributeError:
+            current.drop()
+            raise
+        src.pop().drop()
+        dst.append(current)
+
+    def __get_history(self) -> "_History":
+        """Get snapshots (created when first used)."""
+        if self.__history is None:
+            _setattr(self, "_rsdict__history", _History())
+        return self.__history
+
+    def __take(self) -> "_Snapshot":
+        """Create a snapshot of current values."""
+        values = dict()
+        for key in self.__iter_changed():
+            # (MISSING if removed by pop())
+            values[key] = _copy_value(dict.get(self, key, MISSING))
+        return _Snapshot(self.__inititems, values)
+
+    def __restore(self, snapshot: "_Snapshot") -> None:
+        """Restore values of the snapshot.
+
+        Only changed values are restored
+        unless keys are added or deleted after the snapshot.
+        """
+        inititems = snapshot.inititems
+        values = snapshot.values
+        if inititems is self.__inititems:
+            keys = self.changed_keys()
+            if not keys and not values:
+                return None
+            if self.__options.frozen:
+                raise AttributeError(_ERRORMESSAGES.frozen)
+            keys |= values.keys()
+            self.__log(keys)
+            for key in keys - values.keys():
+                _dict_setitem(self, key, inititems.copy_value(key))
+            for key, value in values.items():
+                if value is MISSING:
+                    dict.pop(self, key, None)
+                else:
+                    _dict_setitem(self, key, _copy_value(value))
+        else:
+            # keys are added or deleted
+            if self.__options.frozen:
+                raise AttributeError(_ERRORMESSAGES.frozen)
+            keys = self.keys() | inititems.keys()
+            self.__log(keys)
+            for key in self.keys() - inititems.keys():
+                dict.__delitem__(self, key)
+            # set each key once (to the value of the snapshot)
+            for key in inititems:
+                if key not in values:
+                    _dict_setitem(self, key, inititems.copy_value(key))
+                elif values[key] is MISSING:
+                    dict.pop(self, key, None)
+                else:
+                    _dict_setitem(self, key, _copy_value(values[key]))
+            if self._keep_order:
+                _reorder(self, [key for key in inititems if key in self])
+            self.__inititems._refs -= 1
+            inititems._refs += 1
+            _setattr(self, "_rsdict__inititems", inititems)
+            _setattr(self, "_rsdict__types", inititems._types)
+        _setattr(self, "_rsdict__changed", set(values) or _EMPTYSET)
+        self.__notify(keys)
+
+    def diff(self):
+        """Yield differences from initial items lazily.
+
+        Only assigned keys, keys of mutable values,
+        and added or deleted keys are compared, not all keys.
+
+        Yields:
+            tuple: (key, initial value, current value).
+                The value of added or deleted key is `MISSING`.
+
+        Examples:
+            >>> rd = rsdict(dict(foo=1, bar="baz"))
+            >>> rd["foo"] = 2
+            >>> list(rd.diff())
+            [('foo', 1, 2)]
+        """
+        inititems = self.__inititems
+        added = inititems._added
+        removed = inititems._removed
+        for key in self.__iter_changed():
+            if key not in added:
+                yield key, inititems[key], dict.get(self, key, MISSING)
+        for key in list(added):
+            if key not in self:
+                if key in self.__changed:
+                    # removed by pop()
+                    yield key, inititems[key], MISSING
+                continue
+            initial = removed.get(key, MISSING)
+            value = self[key]
+            if initial is MISSING or value != initial:
+                yield key, initial, value
+        for key in list(removed):
+            if key not in self:
+                yield key, removed[key], MISSING
+
+    def to_patch(self) -> dict:
+        """Export differences from initial items.
+
+        Returns:
+            dict: Patch to apply to rsdict with the same initial items.
+                "values" (dict): Changed and added values.
+                "removed" (list): Deleted keys.
+                "popped" (list): Keys removed by pop()
+                    (initial values are kept; only if any).
+        """
+        values = dict()
+        removed = list()
+        popped = list()
+        inititems = self.__inititems
+        for key, _, value in self.diff():
+            if value is not MISSING:
+                values[key] = _copy_value(value)
+            elif key in inititems:
+                popped.append(key)
+            else:
+                removed.append(key)
+        patch = dict(values=values, removed=removed)
+        if popped:
+            patch["popped"] = popped
+        return patch
+
+    def apply_patch(self, patch: dict) -> None:
+        """Apply a patch created by to_patch().
+
+        Values are validated before any value is changed,
+        as well as update().
+
+        Args:
+            patch (dict): Patch created by to_patch().
+
+        Raises:
+            (Same as update() and __delitem__.)
+        """
+        removed = [key for key in patch["removed"] if key in self]
+        popped = [key for key in patch.get("popped", ()) if key in self]
+        if removed or popped:
+            if self.__options.frozen:
+                raise AttributeError(_ERRORMESSAGES.frozen)
+            if self.__options.fixkey:
+                raise AttributeError(_ERRORMESSAGES.fixkey)
+        self.update(patch["values"])
+        for key in removed:
+            self.__delkey(key)
+        for key in popped:
+            self.__popkey(key)
+        if removed or popped:
+            self.__notify(removed + popped)
+
+    def subscribe(self, func, keys: Optional[Iterable] = None) -> None:
+        """Call the function after values are set or reset,
+        or keys are added or deleted.
+
+        The function is called once per method call
+        (e.g. `update()`) with all changed keys.
+        Values changed in place are not notified.
+
+        Args:
+            func: Function called as `func(rsdict, keys)`
+                (keys is a frozenset of changed keys).
+            keys (optional): If not None, call only if the keys are changed.
+
+        Examples:
+            >>> rd.subscribe(lambda rd, keys: print(keys))
+            >>> rd.update(foo=2, bar="qux")
+            frozenset({'foo', 'bar'})
+        """
+        if keys is not None:
+            keys = frozenset(keys)
+        self._add_listener(_Subscription(func, keys))
+
+    def unsubscribe(self, func) -> None:
+        """Stop calling the function added by subscribe().
+
+        Raises:
+            ValueError: If the function is not subscribed.
+        """
+        if self.__listeners is not None:
+            for listener in self.__listeners.after:
+                if (type(listener) is _Subscription
+                        and listener.func == func):
+                    return self._remove_listener(listener)
+        raise ValueError("Function is not subscribed")
+
+    def wait_changed(self, keys: Optional[Iterable] = None):
+        """Wait until values are set, or keys are added or deleted.
+
+        Changes in an iteration of the event loop are notified at once.
+        Values changed in place are not notified.
+
+        Args:
+            keys (optional): If not None, wait for changes of the keys only.
+
+        Returns:
+            asyncio.Future: Result is a set of changed keys.
+
+        Examples:
+            >>> keys = await rd.wait_changed()
+        """
+        if keys is not None:
+            keys = frozenset(keys)
+        return self.__get_watcher().wait(keys)
+
+    def watch(self, keys: Optional[Iterable] = None):
+        """Get an async iterator of changed keys.
+
+        Changes in an iteration of the event loop are notified at once,
+        and changes while the consumer is busy are merged.
+
+        Args:
+            keys (optional): If not None, watch changes of the keys only.
+
+        Returns:
+            rsdict_watch: Async iterator of sets of changed keys.
+
+        Examples:
+            >>> with rd.watch() as changes:
+            ...     async for keys in changes:
+            ...         print(keys)
+        """
+        if keys is not None:
+            keys = frozenset(keys)
+        return self.__get_watcher().watch(keys)
+
+    def __get_watcher(self) -> "_Watcher":
+        """Get _Watcher of the current event loop."""
+        loop = asyncio.get_event_loop()
+        listeners = self.__listeners
+        if listeners is not None:
+            watcher = listeners.watcher
+            if (watcher is not None and not watcher.closed
+                    and watcher.loop is loop):
+                return watcher
+        watcher = _Watcher(loop, self)
+        self.__listeners.watcher = watcher
+        return watcher
+
+    def _add_listener(self, func, before: bool = False) -> None:
+        """Add a function called with changed keys after values are set
+        or keys are added or deleted.
+
+        Values changed in place are not notified.
+
+        Args:
+            func: Function called as `func(rsdict, keys)`.
+            before (bool, optional): If True,
+                called before values are changed
+                (keys may not be changed, e.g. if validation fails).
+        """
+        if self.__listeners is None:
+            _setattr(self, "_rsdict__listeners", _Listeners())
+            # bind __setitem__ calling listeners
+            self.__bind_setter(rsdict.__set_notified)
+        if before:
+            self.__listeners.before.append(func)
+        else:
+            self.__listeners.after.append(func)
+
+    def _remove_listener(self, func, before: bool = False) -> None:
+        """Remove a function added by _add_listener().
+
+        Raises:
+            ValueError: If the function is not added.
+        """
+        listeners = self.__listeners
+        if listeners is None:
+            raise ValueError("Listener is not added")
+        if before:
+            listeners.before.remove(func)
+        else:
+            listeners.after.remove(func)
+        if not listeners.before and not listeners.after:
+            _setattr(self, "_rsdict__listeners", None)
+            self.__bind_setter(self.__select_setter())
+
+    def _hold(
+        self,
+        keys,
+        txn: Optional["_Transaction"] = None,
+    ) -> "_Transaction":
+        """Record current values of keys before they are changed,
+        so that a listener can reject the change.
+
+        Args:
+            keys: Keys to be changed.
+            txn (optional): Undo log to add the keys to
+                (e.g. if listeners are called again while changing).
+
+        Returns:
+            _Transaction: Undo log passed to
+                `_revert()` or `_release()` (either must be called).
+        """
+        if txn is None:
+            inititems = self.__inititems
+            # keep initial items (forked if keys are added or deleted)
+            inititems._refs += 1
+            txn = _Transaction(None, inititems, None)
+        log = txn.log
+        for key in keys:
+            if key not in log:
+                log[key] = (dict.get(self, key, _MISSING),
+                            key in self.__changed)
+        return txn
+
+    def _revert(self, txn: "_Transaction") -> None:
+        """Restore values recorded by _hold() and notify listeners."""
+        self.__undo(txn)
+        self.__notify(txn.log.keys())
+
+    def _release(self, txn: "_Transaction") -> None:
+        """Discard the undo log recorded by _hold()."""
+        txn.inititems._refs -= 1
+
+    def __notify(self, keys) -> None:
+        """Call listeners with changed keys."""
+        listeners = self.__listeners
+        if listeners is None or not keys:
+            return None
+        for func in tuple(listeners.after):
+            func(self, keys)
+
     def is_changed(self, key: _KT = None) -> bool:
         """Return whether the value(s) are changed.
 
@@ -454,10 +1971,36 @@ class rsdict(dict):
             bool: If True, the values are changed from initial.
         """
         if key is None:
-            return self != self.get_initial()
+            if len(self) != len(self.__inititems):
+                return True
+            for _ in self.__iter_changed():
+                return True
+            return False
         else:
             return self[key] != self.get_initial(key)
 
+    def changed_keys(self) -> set:
+        """Get keys whose values are changed from initial.
+
+        Returns:
+            set: Changed keys.
+        """
+        return set(self.__iter_changed())
+
+    def __iter_changed(self):
+        """Yield changed keys.
+
+        Only assigned keys and keys of mutable initial values
+        are compared, not all keys.
+        """
+        inititems = self.__inititems
+        for key in self.__changed | inititems._mutables:
+            # (removed by pop() if missing)
+            value = dict.get(self, key, MISSING)
+            initial = inititems[key]
+            if value is not initial and value != initial:
+                yield key
+
 
 class rsdict_frozen(rsdict):
     """rsdict(fozen=True)
@@ -465,15 +2008,19 @@ class rsdict_frozen(rsdict):
     Examples:
         >>> from rsdict import rsdict_frozen as rsdict
     """
+    __slots__ = ()
+
     def __init__(
         self,
         items: dict,
         frozen: bool = True,
         fixkey: bool = True,
         fixtype: bool = True,
-        cast: bool = False
+        cast: bool = False,
+        constraints: Optional[dict] = None,
     ) -> None:
-        return super().__init__(items, frozen, fixkey, fixtype, cast)
+        return super().__init__(
+            items, frozen, fixkey, fixtype, cast, constraints)
 
 
 class rsdict_unfix(rsdict):
@@ -482,15 +2029,19 @@ class rsdict_unfix(rsdict):
     Examples:
         >>> from rsdict import rsdict_unfix as rsdict
     """
+    __slots__ = ()
+
     def __init__(
         self,
         items: dict,
         frozen: bool = False,
         fixkey: bool = False,
         fixtype: bool = False,
-        cast: bool = False
+        cast: bool = False,
+        constraints: Optional[dict] = None,
     ) -> None:
-        return super().__init__(items, frozen, fixkey, fixtype, cast)
+        return super().__init__(
+            items, frozen, fixkey, fixtype, cast, constraints)
 
 
 class rsdict_fixkey(rsdict):
@@ -499,15 +2050,19 @@ class rsdict_fixkey(rsdict):
     Examples:
         >>> from rsdict import rsdict_fixkey as rsdict
     """
+    __slots__ = ()
+
     def __init__(
         self,
         items: dict,
         frozen: bool = False,
         fixkey: bool = True,
         fixtype: bool = False,
-        cast: bool = False
+        cast: bool = False,
+        constraints: Optional[dict] = None,
     ) -> None:
-        return super().__init__(items, frozen, fixkey, fixtype, cast)
+        return super().__init__(
+            items, frozen, fixkey, fixtype, cast, constraints)
 
 
 class rsdict_fixtype(rsdict):
@@ -516,12 +2071,293 @@ class rsdict_fixtype(rsdict):
     Examples:
         >>> from rsdict import rsdict_fixtype as rsdict
     """
+    __slots__ = ()
+
     def __init__(
         self,
         items: dict,
         frozen: bool = False,
         fixkey: bool = False,
         fixtype: bool = True,
-        cast: bool = False
+        cast: bool = False,
+        constraints: Optional[dict] = None,
     ) -> None:
-        return super().__init__(items, frozen, fixkey, fixtype, cast)
+        return super().__init__(
+            items, frozen, fixkey, fixtype, cast, constraints)
+
+
+class rsdict_subtype(rsdict):
+    """rsdict allowing values of subclasses of initial types (if fixtype).
+
+    e.g. `bool` value for `int` key, `OrderedDict` value for `dict` key.
+    Subclass checks are cached for each key and type
+    (shared with copied instances).
+    Values of the same type as initial are checked as fast as rsdict.
+
+    Examples:
+        >>> from rsdict import rsdict_subtype
+        >>> rd = rsdict_subtype(dict(foo=1))
+        >>> rd["foo"] = True
+        >>> rd["foo"]
+        True
+    """
+    __slots__ = ()
+    _subtype = True
+
+
+class rsdict_nested(rsdict):
+    """rsdict with nested dicts wrapped as rsdict_nested.
+
+    Nested dicts are wrapped when accessed first (with the same options),
+    and are not copied until then.
+    Changes of nested values are checked by the parent.
+
+    Note:
+        Initial items are not copied.
+        Nested dicts got by `values()` or `items()` are not wrapped,
+        and must not be changed in place.
+        A dict set to the key of a nested dict is validated
+        as the nested rsdict (keys, types and cast).
+
+    Examples:
+        >>> from rsdict import rsdict_nested
+        >>> rd = rsdict_nested(dict(foo=dict(bar=1)))
+        >>> rd["foo"]["bar"] = 2
+        >>> rd.is_changed()
+        True
+    """
+    __slots__ = ()
+    _inititems_class = _NestedInititems
+
+    def __getitem__(self, key: _KT) -> _VT:
+        value = dict.__getitem__(self, key)
+        if type(value) is dict:
+            # wrap nested dict
+            value = self.__class__(
+                value,
+                frozen=self.frozen,
+                fixkey=self.fixkey,
+                fixtype=self.fixtype,
+                cast=self.cast,
+            )
+            # nested dict is shared with initial values,
+            # so copy mutable values from initial values
+            inititems = value.get_initial()
+            for k in inititems._mutables:
+                _dict_setitem(value, k, inititems.copy_value(k))
+            _dict_setitem(self, key, value)
+        return value
+
+    def get(self, key: _KT, default: _VT = None) -> _VT:
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key: _KT, value: _VT) -> None:
+        if type(value) is dict:
+            value = self.__check_nested(key, value)
+        return super().__setitem__(key, value)
+
+    def update(self, *args, **kwargs) -> None:
+        updates = dict(*args, **kwargs)
+        for key, value in updates.items():
+            if type(value) is dict:
+                updates[key] = self.__check_nested(key, value)
+        return super().update(updates)
+
+    def __check_nested(self, key: _KT, value: dict) -> dict:
+        """Validate the dict set to the key of a nested dict
+        with the options of the nested rsdict.
+
+        Returns:
+            dict: Validated (and cast) value.
+        """
+        if key not in self.get_initial():
+            return value
+        initial = self.get_initial(key)
+        if type(initial) is not dict:
+            return value
+        child = self.__class__(
+            initial,
+            frozen=self.frozen,
+            fixkey=self.fixkey,
+            fixtype=self.fixtype,
+            cast=self.cast,
+        )
+        if self.fixkey and value.keys() != initial.keys():
+            raise AttributeError(_ERRORMESSAGES.fixkey)
+        for k in initial.keys() - value.keys():
+            del child[k]
+        for k, v in value.items():
+            # nested dicts are validated recursively
+            child[k] = v
+        return child.to_dict()
+
+    def copy(
+        self,
+        reset: bool = False,
+        frozen: Optional[bool] = None,
+        fixkey: Optional[bool] = None,
+        fixtype: Optional[bool] = None,
+        cast: Optional[bool] = None,
+    ) -> "rsdict_nested":
+        """Create new rsdict instance (nested rsdicts are copied)."""
+        rdnew = super().copy(reset, frozen, fixkey, fixtype, cast)
+        for key, value in list(dict.items(rdnew)):
+            if isinstance(value, rsdict_nested):
+                _dict_setitem(rdnew, key, value.copy(
+                    frozen=frozen, fixkey=fixkey, fixtype=fixtype, cast=cast))
+        return rdnew
+
+    def __repr__(self) -> str:
+        return "rsdict({}, frozen={}, fixkey={}, fixtype={}, cast={})".format(
+            self.to_dict(),
+            self.frozen,
+            self.fixkey,
+            self.fixtype,
+            self.cast,
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to built-in dictionary instance recursively.
+
+        Returns:
+            dict: Current values.
+        """
+        items = super().to_dict()
+        for key, value in items.items():
+            if isinstance(value, rsdict_nested):
+                items[key] = value.to_dict()
+            elif type(value) is dict:
+                # not wrapped (shared with initial values)
+                items[key] = copy.deepcopy(value)
+        return items
+
+
+class rsdict_template(object):
+    """Template to create many rsdict instances with the same initial items.
+
+    Initial items (keys, types and values) are built once
+    and shared with the created instances.
+
+    Examples:
+        >>> from rsdict import rsdict_template
+        >>> template = rsdict_template(dict(foo=1, bar="baz"))
+        >>> rd = template()
+        >>> rd
+        rsdict({'foo': 1, 'bar': 'baz'},
+            frozen=False, fixkey=True, fixtype=True, cast=False)
+    """
+    __slots__ = ("__prototype",)
+
+    def __init__(
+        self,
+        items: dict,
+        frozen: bool = False,
+        fixkey: bool = True,
+        fixtype: bool = True,
+        cast: bool = False,
+        constraints: Optional[dict] = None,
+    ) -> None:
+        """Initialize template with the same arguments as rsdict."""
+        self.__prototype = rsdict(
+            items, frozen, fixkey, fixtype, cast, constraints)
+
+    def __call__(self) -> rsdict:
+        """Create new rsdict instance with initial values."""
+        return self.__prototype.copy(reset=True)
+
+    def validate_many(
+        self,
+        items: Iterable[dict],
+        workers: Optional[int] = 1,
+        chunksize: int = 1000,
+    ):
+        """Validate many dicts with initial keys and types.
+
+        Each dict is validated (and cast) in the same way as
+        `update()` of a created instance, without creating instances.
+
+        Args:
+            items (Iterable[dict]): Dicts to validate (read lazily).
+            workers (int, optional): Number of worker processes.
+                If 1, dicts are validated in this process.
+                If None, the number of processors is used.
+            chunksize (int, optional): Number of dicts
+                sent to a worker process at once.
+
+        Yields:
+            dict or Exception: Validated dict,
+                or exception raised by validation (in order of items).
+
+        Examples:
+            >>> template = rsdict_template(dict(foo=1), cast=True)
+            >>> list(template.validate_many([dict(foo="2"), dict(bar=3)]))
+            [{'foo': 2}, AttributeError('If fixkey, cannot add or delete keys')]
+        """
+        if workers is not None:
+            _check_instance(workers, int)
+            if workers < 1:
+                raise ValueError("workers must be greater than 0")
+        _check_instance(chunksize, int)
+        if chunksize < 1:
+            raise ValueError("chunksize must be greater than 0")
+        return self.__validate_many(items, workers, chunksize)
+
+    def __validate_many(self, items, workers, chunksize):
+        prototype = self.__prototype
+        inititems = prototype._rsdict__inititems
+        types = dict(inititems._types)
+        options = prototype._rsdict__options
+        iterator = iter(items)
+        chunks = iter(
+            lambda: list(itertools.islice(iterator, chunksize)), [])
+        if workers == 1:
+            # validators compiled with the template
+            for chunk in chunks:
+                yield from _validate_items(
+                    chunk, types, options, inititems._validators)
+            return None
+
+        args = (
+            types,
+            options,
+            dict(inititems._constraints),
+            next(_WORKER_TOKENS),
+        )
+
+        with ProcessPoolExecutor(workers) as executor:
+            # chunks submitted ahead (limited to bound memory)
+            limit = 2 * (workers or os.cpu_count() or 1)
+            futures = deque()
+            for chunk in chunks:
+                futures.append(
+                    executor.submit(_validate_chunk, chunk, *args))
+                if len(futures) >= limit:
+                    yield from futures.popleft().result()
+            while futures:
+                yield from futures.popleft().result()
+
+    def __repr__(self) -> str:
+        prototype = self.__prototype
+        return (
+            "rsdict_template({}, frozen={}, fixkey={}, fixtype={}, cast={})"
+        ).format(
+            dict(prototype.get_initial()),
+            prototype.frozen,
+            prototype.fixkey,
+            prototype.fixtype,
+            prototype.cast,
+        )
+
+    def get_initial(self, key: _KT = None) -> Any:
+        """Get initial value(s).
+
+        Args:
+            key (optional): If None, get all values.
+
+        Returns:
+            dict (if key is None): Initial values.
+            Any (else): Initial value.
+        """
+        return self.__prototype.get_initial(key)
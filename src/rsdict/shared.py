@@ -0,0 +1,208 @@
+import os
+import struct
+from typing import Optional
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+
+from .rsdict import rsdict
+
+
+# generation (and size of data segment)
+_HEADER = struct.Struct("<Q")
+# names of shared memory created by this process (or parent process)
+_CREATED = set()
+
+
+def _create(name: str, size: int) -> "shared_memory.SharedMemory":
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _CREATED.add(name)
+    return shm
+
+
+def _attach(name: str) -> "shared_memory.SharedMemory":
+    """Attach shared memory without unlinking it at exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: resource tracker unlinks it at exit
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _CREATED:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class rsdict_shared(object):
+    """rsdict published to other processes via shared memory.
+
+    The publisher writes rsdict (as `rsdict.dumps()`) to a shared memory
+    block of each generation, and increments the generation counter.
+    Workers attach by name, and load rsdict from the shared memory
+    without copying the buffer.
+
+    Examples:
+        >>> from rsdict import rsdict_frozen, rsdict_shared
+        >>> shared = rsdict_shared()
+        >>> shared.publish(rsdict_frozen(dict(foo=1)))
+        1
+        >>> # in worker process
+        >>> rd = rsdict_shared.attach(shared.name).data
+    """
+    __slots__ = (
+        "__name",
+        "__owner",
+        "__control",
+        "__segments",
+        "__generation",
+        "__data",
+    )
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        """Create a shared rsdict to publish.
+
+        Args:
+            name (str, optional): Name of the shared memory.
+                If None, a random name is used.
+
+        Raises:
+            ImportError: If multiprocessing.shared_memory is not available.
+        """
+        if shared_memory is None:
+            raise ImportError("multiprocessing.shared_memory is required")
+        if name is None:
+            name = "rsdict_" + os.urandom(8).hex()
+        self.__name = name
+        self.__owner = True
+        self.__control = _create(name, _HEADER.size)
+        _HEADER.pack_into(self.__control.buf, 0, 0)
+        # generation: SharedMemory
+        self.__segments = dict()
+        self.__generation = 0
+        self.__data = None
+
+    @classmethod
+    def attach(cls, name: str) -> "rsdict_shared":
+        """Attach a shared rsdict published by other process.
+
+        Args:
+            name (str): Name of the shared memory.
+
+        Raises:
+            FileNotFoundError: If the shared memory does not exist.
+
+        Warning:
+            The data is unpickled when loaded. Attach only to shared memory
+            published by trusted processes.
+        """
+        if shared_memory is None:
+            raise ImportError("multiprocessing.shared_memory is required")
+        self = cls.__new__(cls)
+        self.__name = name
+        self.__owner = False
+        self.__control = _attach(name)
+        self.__segments = dict()
+        self.__generation = 0
+        self.__data = None
+        return self
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def generation(self) -> int:
+        """Generation of the published rsdict (0 if not published)."""
+        return _HEADER.unpack_from(self.__control.buf, 0)[0]
+
+    def is_updated(self) -> bool:
+        """Return whether rsdict is published after `data` is loaded."""
+        return self.generation != self.__generation
+
+    @property
+    def data(self) -> rsdict:
+        """Published rsdict (loaded again if republished).
+
+        Raises:
+            LookupError: If rsdict is not published.
+        """
+        if self.__data is None or self.is_updated():
+            self.__load()
+        return self.__data
+
+    def __load(self) -> None:
+        while True:
+            generation = self.generation
+            if generation == 0:
+                raise LookupError("rsdict is not published")
+            try:
+                shm = _attach("{}_{}".format(self.__name, generation))
+            except FileNotFoundError:
+                if self.generation == generation:
+                    raise
+                # republished and unlinked
+                continue
+            try:
+                size, = _HEADER.unpack_from(shm.buf, 0)
+                with shm.buf[_HEADER.size:_HEADER.size + size] as data:
+                    self.__data = rsdict.loads(data)
+            finally:
+                shm.close()
+            self.__generation = generation
+            return None
+
+    def publish(self, data: rsdict) -> int:
+        """Publish rsdict to workers.
+
+        The shared memory of the generation before the previous one
+        is unlinked.
+
+        Args:
+            data (rsdict): rsdict to publish.
+
+        Returns:
+            int: New generation.
+        """
+        if not self.__owner:
+            raise ValueError("Cannot publish from attached instance")
+        dumped = data.dumps()
+        generation = self.generation + 1
+        shm = _create(
+            "{}_{}".format(self.__name, generation),
+            _HEADER.size + len(dumped),
+        )
+        _HEADER.pack_into(shm.buf, 0, len(dumped))
+        shm.buf[_HEADER.size:_HEADER.size + len(dumped)] = dumped
+        self.__segments[generation] = shm
+        # notify workers
+        _HEADER.pack_into(self.__control.buf, 0, generation)
+        # workers may be attaching the previous generation
+        for old in [g for g in self.__segments if g < generation - 1]:
+            self.__unlink(old)
+        return generation
+
+    def __unlink(self, generation: int) -> None:
+        shm = self.__segments.pop(generation)
+        shm.close()
+        shm.unlink()
+
+    def close(self) -> None:
+        """Close the shared memory (and unlink it if published here)."""
+        if self.__control is None:
+            return None
+        if self.__owner:
+            for generation in list(self.__segments):
+                self.__unlink(generation)
+            self.__control.close()
+            self.__control.unlink()
+        else:
+            self.__control.close()
+        self.__control = None
+
+    def __enter__(self) -> "rsdict_shared":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,515 @@
+import array
+from collections.abc import MutableMapping
+from typing import Any, Iterable, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .cast import _cast
+from .rsdict import (
+    _KT,
+    _VT,
+    _ERRORMESSAGES,
+    _Options,
+    _check_instance,
+    _copy_value,
+    _type_error,
+)
+
+
+# typecodes of numeric columns (array.array)
+_TYPECODES = {bool: "b", int: "q", float: "d"}
+# dtypes of numeric columns (numpy.ndarray)
+_DTYPES = {bool: "bool", int: "int64", float: "float64"}
+# kinds of dtypes accepted without cast (dtype of the array is kept)
+_KINDS = {bool: "b", int: "iu", float: "f"}
+
+
+def _is_changed(current: _VT, initial: _VT) -> bool:
+    """Return whether the value is changed (NaN is not changed from NaN)."""
+    if current is initial or current == initial:
+        return False
+    # NaN
+    return not (current != current and initial != initial)
+
+
+class _Column(object):
+    """Initial and current values of a column."""
+    __slots__ = ("type", "initial", "current")
+
+    def __init__(
+        self,
+        initialtype: Optional[type],
+        values: list,
+        fixtype: bool,
+        cast: bool,
+    ) -> None:
+        # type of values (None if not fixtype)
+        self.type = initialtype if fixtype else None
+        values = self.validate_all(values, cast)
+        if self.type in _TYPECODES:
+            if np is not None:
+                if isinstance(values, np.ndarray):
+                    # keep dtype (e.g. int32)
+                    self.initial = values.copy()
+                else:
+                    self.initial = np.array(values, dtype=_DTYPES[self.type])
+                self.current = self.initial.copy()
+            else:
+                typecode = _TYPECODES[self.type]
+                self.initial = array.array(typecode, values)
+                self.current = array.array(typecode, values)
+        else:
+            self.current = list(values)
+            self.initial = [_copy_value(v) for v in self.current]
+
+    def validate(self, value: _VT, cast: bool) -> _VT:
+        """Return validated (and cast) value."""
+        if self.type is None or type(value) is self.type:
+            return value
+        elif cast:
+            # raise if failed
+            return _cast(value, self.type)
+        else:
+            raise _type_error(self.type, value)
+
+    def validate_all(self, values, cast: bool):
+        """Return validated (and cast) values."""
+        if np is not None and isinstance(values, np.ndarray):
+            if self.type not in _DTYPES:
+                return self.validate_all(values.tolist(), cast)
+            elif values.dtype.kind in _KINDS[self.type]:
+                return values
+            elif cast:
+                # raise if failed
+                return values.astype(_DTYPES[self.type])
+            else:
+                raise TypeError(
+                    "expected {} array, {} found".format(
+                        self.type.__name__,
+                        values.dtype,
+                    )
+                )
+        values = list(values)
+        if self.type is not None:
+            for i, value in enumerate(values):
+                if type(value) is not self.type:
+                    values[i] = self.validate(value, cast)
+        return values
+
+    def get(self, values, index: int) -> _VT:
+        """Get values[index] as Python object."""
+        if self.type in _TYPECODES:
+            # numpy scalar or int (bool)
+            return self.type(values[index])
+        return values[index]
+
+    def tolist(self, values) -> list:
+        """Convert values to list of Python objects."""
+        if self.type is bool and np is None:
+            return [bool(v) for v in values]
+        elif self.type in _TYPECODES:
+            return values.tolist()
+        return list(values)
+
+    def changed(self):
+        """Return mask of changed rows."""
+        if np is not None and self.type in _TYPECODES:
+            current, initial = self.current, self.initial
+            if self.type is float:
+                return ~((current == initial)
+                         | (np.isnan(current) & np.isnan(initial)))
+            return current != initial
+        return [_is_changed(c, i) for c, i in zip(self.current, self.initial)]
+
+    def reset(self, indices: list) -> None:
+        if np is not None and self.type in _TYPECODES:
+            self.current[indices] = self.initial[indices]
+        else:
+            for index in indices:
+                self.current[index] = _copy_value(self.initial[index])
+
+    def set_all(self, values) -> None:
+        if isinstance(self.current, array.array):
+            values = array.array(self.current.typecode, values)
+        self.current[:] = values
+
+    def reset_all(self) -> None:
+        if self.type in _TYPECODES:
+            self.current[:] = self.initial
+        else:
+            self.current[:] = [_copy_value(v) for v in self.initial]
+
+
+class rsdict_table(object):
+    """Columnar table of records with the same keys.
+
+    Each record behaves like a restricted and resetable dictionary
+    (fixkey=True). Numeric (bool, int, float) columns are stored in
+    numpy.ndarray (or array.array if NumPy is not installed).
+
+    Examples:
+        >>> from rsdict import rsdict_table
+        >>> table = rsdict_table(dict(id=[1, 2], name=["foo", "bar"]))
+        >>> table[0]["name"] = "baz"
+        >>> table.is_changed()
+        array([ True, False])
+    """
+    __slots__ = ("__options", "__columns", "__len")
+
+    def __init__(
+        self,
+        columns: dict,
+        frozen: bool = False,
+        fixtype: bool = True,
+        cast: bool = False,
+    ) -> None:
+        """Initialize rsdict_table instance
+        with columns(dict) and optional arguments(bool).
+
+        Args:
+            columns (dict): Initial values of each key.
+                {key: sequence of values}
+            frozen (bool, optional): If True,
+                the instance will be frozen (immutable).
+            fixtype (bool, optional): If True,
+                cannot change type of keys.
+                Type of each column is the type of the first value.
+            cast (bool, optional): If True,
+                cast to initial type (if possible).
+
+        Raises:
+            ValueError: If the lengths of columns are not the same.
+        """
+        _check_instance(columns, dict)
+        _check_instance(frozen, int, classname="bool")
+        _check_instance(fixtype, int, classname="bool")
+        _check_instance(cast, int, classname="bool")
+        self.__options = _Options(
+            frozen=bool(frozen),
+            fixkey=True,
+            fixtype=bool(fixtype),
+            cast=bool(cast),
+        )
+
+        self.__columns = dict()
+        self.__len = None
+        for key, values in columns.items():
+            if np is None or not isinstance(values, np.ndarray):
+                values = list(values)
+            if self.__len is None:
+                self.__len = len(values)
+            elif len(values) != self.__len:
+                raise ValueError("Lengths of columns do not match")
+            if len(values):
+                initialtype = type(self.__item(values[0]))
+            else:
+                initialtype = None
+            self.__columns[key] = _Column(
+                initialtype, values, bool(fixtype), bool(cast))
+        if self.__len is None:
+            self.__len = 0
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[dict],
+        frozen: bool = False,
+        fixtype: bool = True,
+        cast: bool = False,
+    ) -> "rsdict_table":
+        """Create rsdict_table instance from records(dicts).
+
+        Raises:
+            AttributeError: If keys of records are not the same.
+        """
+        columns = None
+        for record in records:
+            _check_instance(record, dict)
+            if columns is None:
+                columns = {key: [] for key in record}
+            elif record.keys() != columns.keys():
+                raise AttributeError(_ERRORMESSAGES.fixkey)
+            for key, value in record.items():
+                columns[key].append(value)
+        if columns is None:
+            columns = dict()
+        return cls(columns, frozen=frozen, fixtype=fixtype, cast=cast)
+
+    @property
+    def frozen(self) -> bool:
+        return self.__options.frozen
+
+    @property
+    def fixkey(self) -> bool:
+        return self.__options.fixkey
+
+    @property
+    def fixtype(self) -> bool:
+        return self.__options.fixtype
+
+    @property
+    def cast(self) -> bool:
+        return self.__options.cast
+
+    def __len__(self) -> int:
+        """Return number of records."""
+        return self.__len
+
+    def __getitem__(self, index: int) -> "_Row":
+        """Get a record as rsdict-like view."""
+        if index < 0:
+            index += self.__len
+        if not 0 <= index < self.__len:
+            raise IndexError("rsdict_table index out of range")
+        return _Row(self, index)
+
+    def __iter__(self):
+        for index in range(self.__len):
+            yield _Row(self, index)
+
+    def __repr__(self) -> str:
+        return "rsdict_table({}, frozen={}, fixtype={}, cast={})".format(
+            {key: self.column(key) for key in self.__columns},
+            self.frozen,
+            self.fixtype,
+            self.cast,
+        )
+
+    def keys(self) -> list:
+        return list(self.__columns)
+
+    @staticmethod
+    def __item(value: _VT) -> _VT:
+        """Convert numpy scalar to Python object."""
+        if np is not None and isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def column(self, key: _KT) -> list:
+        """Get current values of the key."""
+        column = self.__columns[key]
+        return column.tolist(column.current)
+
+    def get_initial(self, key: _KT) -> list:
+        """Get initial values of the key."""
+        column = self.__columns[key]
+        return column.tolist(column.initial)
+
+    def set_column(self, key: _KT, values: Iterable) -> None:
+        """Set all values of the key.
+
+        Values are validated (and cast) before any value is changed.
+
+        Raises:
+            AttributeError: If frozen.
+            KeyError: If the key does not exist.
+            TypeError: If fixtype and not cast
+                and type(value)!=type(initial_value).
+            ValueError: If fixtype and failed in casting.
+            ValueError: If the length of values is not the same.
+        """
+        if self.frozen:
+            raise AttributeError(_ERRORMESSAGES.frozen)
+        column = self.__columns[key]
+        values = column.validate_all(values, self.cast)
+        if len(values) != self.__len:
+            raise ValueError("Length of values does not match")
+        column.set_all(values)
+
+    def is_changed(
+        self,
+        key: Optional[_KT] = None,
+    ) -> Union[list, "np.ndarray"]:
+        """Return mask of records changed from initial.
+
+        Args:
+            key (optional): If not None, check the key only.
+
+        Returns:
+            numpy.ndarray (if NumPy is installed) or list:
+                Boolean mask of records.
+        """
+        if key is not None:
+            changed = self.__columns[key].changed()
+        elif np is not None:
+            changed = np.zeros(self.__len, dtype=bool)
+            for column in self.__columns.values():
+                changed |= column.changed()
+        else:
+            changed = [False] * self.__len
+            for column in self.__columns.values():
+                changed = [x or y for x, y in zip(changed, column.changed())]
+        if np is not None:
+            return np.asarray(changed, dtype=bool)
+        return changed
+
+    def reset(self, rows: Optional[Iterable] = None) -> None:
+        """Reset records to initial values.
+
+        Args:
+            rows (optional): Boolean mask or indices of records.
+                If None, reset all records.
+        """
+        if self.frozen:
+            if any(self.is_changed()):
+                raise AttributeError(_ERRORMESSAGES.frozen)
+            return None
+        if rows is None:
+            for column in self.__columns.values():
+                column.reset_all()
+            return None
+        if np is not None and isinstance(rows, np.ndarray):
+            if rows.dtype == bool:
+                rows = np.flatnonzero(rows)
+            rows = rows.tolist()
+        else:
+            rows = list(rows)
+            if rows and all(type(row) is bool for row in rows):
+                # mask -> indices
+                rows = [i for i, row in enumerate(rows) if row]
+        for column in self.__columns.values():
+            column.reset(rows)
+
+    def _get(self, index: int, key: _KT) -> _VT:
+        column = self.__columns[key]
+        return column.get(column.current, index)
+
+    def _get_initial(self, index: int, key: _KT) -> _VT:
+        column = self.__columns[key]
+        return column.get(column.initial, index)
+
+    def _set(self, index: int, key: _KT, value: _VT) -> None:
+        if self.frozen:
+            raise AttributeError(_ERRORMESSAGES.frozen)
+        elif key not in self.__columns:
+            raise AttributeError(_ERRORMESSAGES.fixkey)
+        column = self.__columns[key]
+        column.current[index] = column.validate(value, self.cast)
+
+    def _reset(self, index: int, key: _KT) -> None:
+        if self.frozen:
+            raise AttributeError(_ERRORMESSAGES.frozen)
+        self.__columns[key].reset([index])
+
+
+class _Row(MutableMapping):
+    """Record of rsdict_table, which behaves like rsdict."""
+    __slots__ = ("__table", "__index")
+
+    def __init__(self, table: rsdict_table, index: int) -> None:
+        self.__table = table
+        self.__index = index
+
+    @property
+    def frozen(self) -> bool:
+        return self.__table.frozen
+
+    @property
+    def fixkey(self) -> bool:
+        return self.__table.fixkey
+
+    @property
+    def fixtype(self) -> bool:
+        return self.__table.fixtype
+
+    @property
+    def cast(self) -> bool:
+        return self.__table.cast
+
+    def __getitem__(self, key: _KT) -> _VT:
+        return self.__table._get(self.__index, key)
+
+    def __setitem__(self, key: _KT, value: _VT) -> None:
+        return self.__table._set(self.__index, key, value)
+
+    def __delitem__(self, key: _KT) -> None:
+        if self.frozen:
+            raise AttributeError(_ERRORMESSAGES.frozen)
+        raise AttributeError(_ERRORMESSAGES.fixkey)
+
+    def __iter__(self):
+        return iter(self.__table.keys())
+
+    def __len__(self) -> int:
+        return len(self.__table.keys())
+
+    def __str__(self) -> str:
+        return str(self.to_dict())
+
+    def __repr__(self) -> str:
+        return "rsdict({}, frozen={}, fixkey={}, fixtype={}, cast={})".format(
+            self.to_dict(),
+            self.frozen,
+            self.fixkey,
+            self.fixtype,
+            self.cast,
+        )
+
+    def set(self, key: _KT, value: _VT) -> None:
+        """Alias of __setitem__."""
+        return self.__setitem__(key, value)
+
+    def to_dict(self) -> dict:
+        """Convert to built-in dictionary instance.
+
+        Returns:
+            dict: Current values.
+        """
+        return dict(self.items())
+
+    def get_initial(self, key: _KT = None) -> Any:
+        """Get initial value(s).
+
+        Args:
+            key (optional): If None, get all values.
+
+        Returns:
+            dict (if key is None): Initial values.
+            Any (else): Initial value.
+        """
+        if key is None:
+            return {k: self.get_initial(k) for k in self}
+        return self.__table._get_initial(self.__index, key)
+
+    def is_changed(self, key: _KT = None) -> bool:
+        """Return whether the value(s) are changed.
+
+        Args:
+            key (optional): If not None, check the key only.
+
+        Returns:
+            bool: If True, the values are changed from initial.
+        """
+        if key is None:
+            return bool(self.changed_keys())
+        return _is_changed(self[key], self.get_initial(key))
+
+    def changed_keys(self) -> set:
+        """Get keys whose values are changed from initial.
+
+        Returns:
+            set: Changed keys.
+        """
+        return set(key for key in self if self.is_changed(key))
+
+    def reset(self, key: _KT = None) -> None:
+        """Reset value(s) to initial value(s).
+
+        Args:
+            key (optional): If None, reset all values.
+        """
+        if key is None:
+            keys = self.changed_keys()
+        elif self.is_changed(key):
+            keys = (key,)
+        else:
+            return None
+        for k in keys:
+            self.__table._reset(self.__index, k)
+
+    def reset_all(self) -> None:
+        """Alias of reset()."""
+        self.reset()
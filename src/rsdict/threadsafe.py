@@ -0,0 +1,258 @@
+import sys
+import bisect
+import contextlib
+import functools
+import threading
+from collections.abc import Mapping
+
+from .rsdict import MISSING, _KT, _VT, _setattr, rsdict
+
+
+def _synchronized(func):
+    """Decorator to call the method holding the lock of rsdict_concurrent."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self._rsdict_concurrent__lock:
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+class _Versions(object):
+    """Old values of rsdict_concurrent kept for open snapshots."""
+    __slots__ = ("version", "readers", "history")
+
+    def __init__(self) -> None:
+        # incremented when values are changed
+        self.version = 0
+        # version of open snapshots: number of them
+        self.readers = dict()
+        # key: list of (version changed, value before changed)
+        self.history = dict()
+
+    def acquire(self) -> int:
+        """Open a snapshot of the current version (called holding the lock).
+        """
+        version = self.version
+        self.readers[version] = self.readers.get(version, 0) + 1
+        return version
+
+    def release(self, version: int) -> bool:
+        """Close a snapshot (called holding the lock).
+
+        Values older than the oldest open snapshot are dropped.
+
+        Returns:
+            bool: True if no snapshots are open.
+        """
+        readers = self.readers
+        readers[version] -= 1
+        if readers[version]:
+            return False
+        del readers[version]
+        if not readers:
+            return True
+        oldest = min(readers)
+        if oldest > version:
+            self.trim(oldest)
+        return False
+
+    def trim(self, oldest: int) -> None:
+        """Drop values not read by snapshots of the version or later."""
+        history = self.history
+        for key, entries in list(history.items()):
+            if entries[0][0] > oldest:
+                continue
+            n = bisect.bisect_left(entries, (oldest + 1,))
+            if n == len(entries):
+                del history[key]
+            else:
+                # replaced (not changed in place) for lock-free readers
+                history[key] = entries[n:]
+
+    def record(self, data: rsdict, keys) -> None:
+        """Record values before changed (called holding the lock)."""
+        self.version += 1
+        version = self.version
+        history = self.history
+        for key in keys:
+            entry = (version, dict.get(data, key, MISSING))
+            try:
+                history[key].append(entry)
+            except KeyError:
+                history[key] = [entry]
+
+
+class rsdict_view(Mapping):
+    """Read-only view of rsdict_concurrent at a version.
+
+    Created by `rsdict_concurrent.read_snapshot()`.
+    """
+    __slots__ = ("__data", "__version", "__history")
+
+    def __init__(
+        self,
+        data: "rsdict_concurrent",
+        version: int,
+        history: dict,
+    ) -> None:
+        self.__data = data
+        self.__version = version
+        self.__history = history
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    def _close(self) -> None:
+        self.__history = None
+
+    def __getitem__(self, key: _KT) -> _VT:
+        if self.__history is None:
+            raise ValueError("Snapshot is closed")
+        # read current value before history
+        # (history is appended before current value is changed)
+        value = dict.get(self.__data, key, MISSING)
+        entries = self.__history.get(key)
+        if entries:
+            # first change after the snapshot (versions are sorted)
+            i = bisect.bisect_left(entries, (self.__version + 1,))
+            if i < len(entries):
+                value = entries[i][1]
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        if self.__history is None:
+            raise ValueError("Snapshot is closed")
+        keys = list(dict.copy(self.__data))
+        keys.extend(self.__history.keys() - set(keys))
+        for key in keys:
+            if key in self:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: _KT) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self) -> str:
+        return "rsdict_view({})".format(self.to_dict())
+
+    def to_dict(self) -> dict:
+        """Convert to built-in dictionary instance.
+
+        Returns:
+            dict: Values at the version.
+        """
+        return {key: self[key] for key in self}
+
+
+class rsdict_concurrent(rsdict):
+    """Thread-safe rsdict.
+
+    Methods changing values or keys are serialized with a lock,
+    so current and initial items are changed atomically.
+    Reading values (`rd[key]`, `get()`, `in`, iteration)
+    is not locked and is as fast as dict.
+
+    Note:
+        The order of keys is not restored by rollback of transactions
+        and `restore()` (keys deleted and restored are moved to the end),
+        because reordering would remove keys while readers read them.
+
+    Examples:
+        >>> from rsdict import rsdict_concurrent as rsdict
+    """
+    __slots__ = ("__lock", "__versions")
+    # readers never miss keys which are not deleted
+    _keep_order = False
+
+    def __new__(cls, *args, **kwargs) -> "rsdict_concurrent":
+        self = super().__new__(cls)
+        # created here (not in __init__) for copy() and load()
+        _setattr(self, "_rsdict_concurrent__lock", threading.RLock())
+        # old values for read_snapshot() (created when used)
+        _setattr(self, "_rsdict_concurrent__versions", None)
+        return self
+
+    __setitem__ = _synchronized(rsdict.__setitem__)
+    __delitem__ = _synchronized(rsdict.__delitem__)
+    update = _synchronized(rsdict.update)
+    clear = _synchronized(rsdict.clear)
+    setdefault = _synchronized(rsdict.setdefault)
+    pop = _synchronized(rsdict.pop)
+    popitem = _synchronized(rsdict.popitem)
+    reset = _synchronized(rsdict.reset)
+    copy = _synchronized(rsdict.copy)
+    __reduce__ = _synchronized(rsdict.__reduce__)
+    __deepcopy__ = _synchronized(rsdict.__deepcopy__)
+    is_changed = _synchronized(rsdict.is_changed)
+    changed_keys = _synchronized(rsdict.changed_keys)
+    to_patch = _synchronized(rsdict.to_patch)
+    apply_patch = _synchronized(rsdict.apply_patch)
+    save = _synchronized(rsdict.save)
+    snapshot = _synchronized(rsdict.snapshot)
+    restore = _synchronized(rsdict.restore)
+    delete_snapshot = _synchronized(rsdict.delete_snapshot)
+    checkpoint = _synchronized(rsdict.checkpoint)
+    undo = _synchronized(rsdict.undo)
+    redo = _synchronized(rsdict.redo)
+    _add_listener = _synchronized(rsdict._add_listener)
+    _remove_listener = _synchronized(rsdict._remove_listener)
+    if sys.version_info >= (3, 9):
+        __ior__ = _synchronized(rsdict.__ior__)
+
+    def diff(self):
+        """Yield differences from initial items.
+
+        Differences are collected holding the lock (not lazily).
+        """
+        with self.__lock:
+            items = list(super().diff())
+        for item in items:
+            yield item
+
+    @contextlib.contextmanager
+    def read_snapshot(self):
+        """Context manager to read consistent values of a version.
+
+        Taking a snapshot does not copy values, and does not block writers.
+        While snapshots are open, writers keep the values before changed.
+        Values changed in place are not kept.
+
+        Examples:
+            >>> with rd.read_snapshot() as view:
+            ...     foo, bar = view["foo"], view["bar"]
+        """
+        with self.__lock:
+            versions = self.__versions
+            if versions is None:
+                versions = _Versions()
+                _setattr(self, "_rsdict_concurrent__versions", versions)
+                self._add_listener(versions.record, before=True)
+            view = rsdict_view(self, versions.acquire(), versions.history)
+        try:
+            yield view
+        finally:
+            view._close()
+            with self.__lock:
+                if versions.release(view.version):
+                    self._remove_listener(versions.record, before=True)
+                    _setattr(self, "_rsdict_concurrent__versions", None)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Context manager to change values atomically.
+
+        The lock is held until the block ends,
+        so other threads cannot change values in the block.
+        """
+        with self.__lock:
+            with super().transaction() as rd:
+                yield rd
@@ -0,0 +1,190 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Optional
+
+
+def _filter(keys: frozenset, targets: Optional[frozenset]) -> frozenset:
+    """Get keys to notify."""
+    if targets is None:
+        return keys
+    return keys & targets
+
+
+class _Watcher(object):
+    """Notify changed keys of rsdict to asyncio tasks.
+
+    Changed keys are collected and notified once per event loop iteration.
+    """
+    __slots__ = (
+        "loop",
+        "closed",
+        "__data",
+        "__thread",
+        "__lock",
+        "__pending",
+        "__scheduled",
+        "__waiters",
+        "__iterators",
+    )
+
+    def __init__(self, loop, data) -> None:
+        self.loop = loop
+        self.closed = False
+        self.__data = data
+        self.__thread = threading.get_ident()
+        self.__lock = threading.Lock()
+        # changed keys not notified yet
+        self.__pending = set()
+        self.__scheduled = False
+        # list of (future, keys)
+        self.__waiters = list()
+        self.__iterators = weakref.WeakSet()
+        data._add_listener(self.notify)
+
+    def notify(self, data, keys) -> None:
+        """Listener of rsdict (may be called from other threads).
+
+        Never raises, because values are already changed.
+        """
+        if self.loop.is_closed():
+            return self.__detach()
+        with self.__lock:
+            self.__pending.update(keys)
+            if self.__scheduled:
+                return None
+            self.__scheduled = True
+        try:
+            if threading.get_ident() == self.__thread:
+                self.loop.call_soon(self.__flush)
+            else:
+                self.loop.call_soon_threadsafe(self.__flush)
+        except RuntimeError:
+            # event loop is closed
+            self.__detach()
+
+    def __flush(self) -> None:
+        """Wake waiters and iterators with keys changed in this iteration."""
+        with self.__lock:
+            keys = frozenset(self.__pending)
+            self.__pending = set()
+            self.__scheduled = False
+        waiters = list()
+        for future, targets in self.__waiters:
+            if future.done():
+                continue
+            changed = _filter(keys, targets)
+            if changed:
+                future.set_result(changed)
+            else:
+                waiters.append((future, targets))
+        self.__waiters = waiters
+        for iterator in list(self.__iterators):
+            iterator._put(keys)
+        self.__release()
+
+    def __release(self) -> None:
+        """Remove listener if nothing is waiting."""
+        if self.__waiters or len(self.__iterators):
+            return None
+        self.__detach()
+
+    def __detach(self) -> None:
+        """Remove listener."""
+        if self.closed:
+            return None
+        self.closed = True
+        try:
+            self.__data._remove_listener(self.notify)
+        except ValueError:
+            # already removed
+            pass
+
+    def __done(self, future: "asyncio.Future") -> None:
+        """Drop the waiter (e.g. cancelled or timed out)."""
+        self.__waiters = [
+            (f, targets) for f, targets in self.__waiters if f is not future]
+        self.__release()
+
+    def wait(self, keys: Optional[frozenset]) -> "asyncio.Future":
+        future = self.loop.create_future()
+        self.__waiters.append((future, keys))
+        future.add_done_callback(self.__done)
+        return future
+
+    def watch(self, keys: Optional[frozenset]) -> "rsdict_watch":
+        iterator = rsdict_watch(self, keys)
+        self.__iterators.add(iterator)
+        return iterator
+
+    def discard(self, iterator: "rsdict_watch") -> None:
+        self.__iterators.discard(iterator)
+        self.__release()
+
+
+class rsdict_watch(object):
+    """Async iterator of changed keys of rsdict.
+
+    Created by `rsdict.watch()`. Keys changed while the consumer
+    is busy are merged into the next item.
+
+    Examples:
+        >>> async for keys in rd.watch():
+        ...     print(keys)
+    """
+    __slots__ = (
+        "__watcher",
+        "__keys",
+        "__pending",
+        "__future",
+        "__weakref__",
+    )
+
+    def __init__(self, watcher: _Watcher, keys: Optional[frozenset]) -> None:
+        self.__watcher = watcher
+        self.__keys = keys
+        self.__pending = set()
+        self.__future = None
+
+    def _put(self, keys: frozenset) -> None:
+        """Called by _Watcher with changed keys."""
+        keys = _filter(keys, self.__keys)
+        if not keys:
+            return None
+        future = self.__future
+        if future is not None and not future.done():
+            self.__future = None
+            future.set_result(keys)
+        else:
+            self.__pending.update(keys)
+
+    def __aiter__(self) -> "rsdict_watch":
+        return self
+
+    def __anext__(self) -> "asyncio.Future":
+        if self.__watcher is None:
+            raise StopAsyncIteration
+        future = self.__watcher.loop.create_future()
+        if self.__pending:
+            future.set_result(self.__pending)
+            self.__pending = set()
+        else:
+            self.__future = future
+        return future
+
+    def __enter__(self) -> "rsdict_watch":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop watching (iteration is stopped)."""
+        watcher = self.__watcher
+        if watcher is None:
+            return None
+        self.__watcher = None
+        watcher.discard(self)
+        future = self.__future
+        if future is not None and not future.done():
+            future.set_exception(StopAsyncIteration())
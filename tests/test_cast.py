@@ -0,0 +1,133 @@
+"""pytest
+
+Requirements:
+pip install -r requirements/test.txt
+Usage:
+pytest -vsl --cov=./src/rsdict --cov-report=term-missing
+"""
+from pathlib import Path
+
+import pytest
+
+from src.rsdict import (
+    get_converter,
+    register_converter,
+    rsdict,
+    rsdict_table,
+    rsdict_template,
+)
+from src.rsdict.cast import _str_to_bool
+
+
+@pytest.fixture(scope="function", autouse=False)
+def converter():
+    """Register str -> list converter temporarily."""
+    register_converter(str, list, lambda x: x.split(","))
+    yield
+    register_converter(str, list, None)
+
+
+class TestCast(object):
+    @pytest.mark.parametrize(("value", "expected"), [
+        ("true", True),
+        ("True", True),
+        (" yes ", True),
+        ("1", True),
+        ("false", False),
+        ("OFF", False),
+        ("0", False),
+        (0, False),
+        (2.5, True),
+    ])
+    def test_bool(self, value, expected):
+        data = rsdict(dict(a=True), cast=True)
+        data["a"] = value
+        assert data["a"] is expected
+        # cached
+        data["a"] = value
+        assert data["a"] is expected
+
+    def test_bool_raise(self):
+        data = rsdict(dict(a=True), cast=True)
+        with pytest.raises(ValueError):
+            data["a"] = "hoge"
+        with pytest.raises(ValueError):
+            data["a"] = ""
+        assert data["a"] is True
+
+    def test_cast(self):
+        data = rsdict(
+            dict(int=0, float=0.5, path=Path("a"), tuple=()), cast=True)
+        data["int"] = "10"
+        data["float"] = "1.5"
+        data["path"] = "b"
+        data["tuple"] = "ab"
+        assert data.to_dict() == dict(
+            int=10, float=1.5, path=Path("b"), tuple=("a", "b"))
+        with pytest.raises(ValueError):
+            data["int"] = "1.5"
+
+    def test_update(self):
+        data = rsdict(dict(a=True, b=0, c="x"), fixkey=False, cast=True)
+        data.update(a="false", b="2", c=3, d="true")
+        assert data.to_dict() == dict(a=False, b=2, c="3", d="true")
+        # all-or-nothing
+        with pytest.raises(ValueError):
+            data.update(a="true", b="hoge")
+        assert data["a"] is False
+
+        template = rsdict_template(dict(a=True), cast=True)
+        assert list(template.validate_many([dict(a="no")])) == [dict(a=False)]
+
+    def test_table(self):
+        table = rsdict_table(dict(a=[True, False]), cast=True)
+        table[0]["a"] = "false"
+        table.set_column("a", ["no", "yes"])
+        assert table.column("a") == [False, True]
+
+    def test_register(self, converter):
+        assert get_converter(str, list)("a,b") == ["a", "b"]
+        data = rsdict(dict(a=["x"]), cast=True)
+        data["a"] = "y,z"
+        assert data["a"] == ["y", "z"]
+        # not shared with other values
+        data["a"].append("!")
+        data["a"] = "y,z"
+        assert data["a"] == ["y", "z"]
+
+        # cache is cleared
+        data = rsdict(dict(a=0), cast=True)
+        data["a"] = "10"
+        register_converter(str, int, lambda x: int(x, 0))
+        try:
+            data["a"] = "0x10"
+            assert data["a"] == 16
+        finally:
+            register_converter(str, int, int)
+        with pytest.raises(ValueError):
+            data["a"] = "0x10"
+        register_converter(str, int, lambda x: int(x) * 2)
+        try:
+            data["a"] = "10"
+            assert data["a"] == 20
+        finally:
+            register_converter(str, int, int)
+        data["a"] = "10"
+        assert data["a"] == 10
+
+    def test_register_remove(self):
+        register_converter(str, bool, None)
+        try:
+            assert get_converter(str, bool) is bool
+            data = rsdict(dict(a=True), cast=True)
+            data["a"] = "false"
+            assert data["a"] is True
+        finally:
+            register_converter(str, bool, _str_to_bool)
+        assert get_converter(str, bool)("false") is False
+
+    def test_register_raise(self):
+        with pytest.raises(TypeError):
+            register_converter("str", int, int)
+        with pytest.raises(TypeError):
+            register_converter(str, int, 1)
@@ -0,0 +1,198 @@
+"""pytest
+
+Requirements:
+pip install -r requirements/test.txt
+Usage:
+pytest -vsl --cov=./src/rsdict --cov-report=term-missing
+"""
+import copy
+import importlib
+import pickle
+import re
+
+import pytest
+
+from src.rsdict import (
+    rsdict,
+    rsdict_frozen,
+    rsdict_subtype,
+    rsdict_template,
+)
+from src.rsdict.constraint import _compile_all
+from src.rsdict.rsdict import _Options
+
+# (the package exports rsdict class with the same name)
+rsdict_module = importlib.import_module("src.rsdict.rsdict")
+
+
+InitItems = dict(port=80, mode="a", name="abc", ratio=0.5, tags=["x"], free=0)
+Constraints = dict(
+    port=dict(min=1, max=65535),
+    mode=dict(choices=["a", "b"]),
+    name=dict(pattern=r"[a-z]+"),
+    ratio=dict(min=0.0, max=1.0),
+    tags=dict(choices=[["x"], ["y"]]),
+    free=dict(),
+)
+
+
+@pytest.fixture(scope="function", autouse=False)
+def data():
+    return rsdict(
+        copy.deepcopy(InitItems),
+        fixkey=False,
+        cast=True,
+        constraints=Constraints,
+    )
+
+
+class TestConstraint(object):
+    @pytest.mark.parametrize(("key", "value", "expected"), [
+        ("port", 1, 1),
+        ("port", "65535", 65535),
+        ("mode", "b", "b"),
+        ("name", "xyz", "xyz"),
+        ("ratio", 1, 1.0),
+        ("tags", ["y"], ["y"]),
+        ("free", -1, -1),
+    ])
+    def test_set(self, data, key, value, expected):
+        data[key] = value
+        assert data[key] == expected
+        data.update({key: value})
+        assert data[key] == expected
+
+    @pytest.mark.parametrize(("key", "value"), [
+        ("port", 0),
+        ("port", "65536"),
+        ("mode", "c"),
+        ("name", "abc1"),
+        ("name", "ABC"),
+        ("ratio", 1.5),
+        ("tags", ["z"]),
+    ])
+    def test_set_raise(self, data, key, value):
+        with pytest.raises(ValueError):
+            data[key] = value
+        # all-or-nothing
+        with pytest.raises(ValueError):
+            data.update({"free": 1, key: value})
+        assert data.to_dict() == InitItems
+        assert not data.is_changed()
+
+    def test_fixtype(self):
+        data = rsdict(dict(port=80), constraints=dict(port=dict(min=1)))
+        # TypeError before validation
+        with pytest.raises(TypeError):
+            data["port"] = "0"
+        data = rsdict(
+            dict(port=80), fixtype=False, constraints=dict(port=dict(min=1)))
+        data["port"] = 2.5
+        with pytest.raises(ValueError):
+            data["port"] = 0.5
+        data = rsdict_subtype(
+            dict(port=80), constraints=dict(port=dict(min=1)))
+        data["port"] = True
+        with pytest.raises(ValueError):
+            data["port"] = False
+
+    def test_key(self, data):
+        data["new"] = -1
+        data["new"] = -2
+        # constraints are deleted with the key
+        del data["port"]
+        data["port"] = 0
+        data["port"] = -1
+        assert data.get_initial("port") == 0
+        data.clear()
+        data["mode"] = "c"
+
+    def test_copy(self, data):
+        data["port"] = 8080
+        copies = [
+            data.copy(),
+            data.copy(reset=True),
+            data.copy(cast=False),
+            copy.deepcopy(data),
+            pickle.loads(pickle.dumps(data)),
+            rsdict.loads(data.dumps()),
+        ]
+        for data2 in copies:
+            with pytest.raises(ValueError):
+                data2["port"] = 0
+            data2["free"] = -1
+        data2 = data.copy(frozen=True)
+        assert data2.get_initial("port") == 8080
+        with pytest.raises(AttributeError):
+            data2["port"] = 0
+        # shared constraints are not changed
+        data2 = data.copy()
+        del data2["port"]
+        data2["port"] = 0
+        with pytest.raises(ValueError):
+            data["port"] = 0
+
+    def test_listener(self, data):
+        keys = list()
+        data.subscribe(lambda rd, changed: keys.append(changed))
+        with pytest.raises(ValueError):
+            data["port"] = 0
+        data["port"] = 2
+        with pytest.raises(ValueError):
+            with data.transaction():
+                data["mode"] = "b"
+                data["mode"] = "c"
+        assert data["mode"] == "a"
+        assert keys[0] == {"port"}
+
+    def test_template(self):
+        template = rsdict_template(
+            dict(port=80), cast=True, constraints=dict(port=dict(min=1)))
+        with pytest.raises(ValueError):
+            template()["port"] = 0
+        for workers in [1, 2]:
+            results = list(template.validate_many(
+                [dict(port="0"), dict(port="2")], workers=workers))
+            assert isinstance(results[0], ValueError)
+            assert results[1] == dict(port=2)
+
+    def test_template_compile(self, monkeypatch):
+        template = rsdict_template(
+            dict(port=80), cast=True, constraints=dict(port=dict(min=1)))
+        compiled = list()
+
+        def compile_all(constraints):
+            compiled.append(constraints)
+            return _compile_all(constraints)
+        monkeypatch.setattr(rsdict_module, "_compile_all", compile_all)
+
+        items = [dict(port=str(i)) for i in range(10)]
+        results = list(template.validate_many(items, chunksize=2))
+        assert isinstance(results[0], ValueError)
+        assert results[1:] == [dict(port=i) for i in range(1, 10)]
+        assert compiled == []
+
+        # in worker process
+        options = _Options(False, True, True, False)
+        args = (dict(port=int), options, dict(port=dict(min=1)))
+        for token in [0, 0, 1, 1]:
+            results = rsdict_module._validate_chunk(
+                [dict(port=0)], *args, token)
+            assert isinstance(results[0], ValueError)
+        assert len(compiled) == 2
+
+    def test_init_raise(self):
+        with pytest.raises(TypeError):
+            rsdict(dict(port=80), constraints=[("port", dict(min=1))])
+        with pytest.raises(TypeError):
+            rsdict(dict(port=80), constraints=dict(port=1))
+        with pytest.raises(ValueError):
+            rsdict(dict(port=80), constraints=dict(port=dict(minimum=1)))
+        with pytest.raises(KeyError):
+            rsdict(dict(port=80), constraints=dict(hoge=dict(min=1)))
+        # initial values are validated
+        with pytest.raises(ValueError):
+            rsdict(dict(port=0), constraints=dict(port=dict(min=1)))
+        with pytest.raises(ValueError):
+            rsdict_frozen(dict(name="A"), constraints=dict(
+                name=dict(pattern=re.compile("[a-z]"))))
@@ -0,0 +1,165 @@
+"""pytest
+
+Requirements:
+pip install -r requirements/test.txt
+Usage:
+pytest -vsl --cov=./src/rsdict --cov-report=term-missing
+"""
+import copy
+import threading
+
+import pytest
+
+from src.rsdict import rsdict, rsdict_journal
+
+
+InitItems = {
+    "int": 0,
+    "float": 1.1,
+    "list": ["hello"],
+    "str": "abc",
+}
+
+
+@pytest.fixture(scope="function", autouse=False)
+def file(tmp_path):
+    return tmp_path / "data.journal"
+
+
+def reopen(file, **kwargs) -> rsdict:
+    with rsdict_journal(file, copy.deepcopy(InitItems), **kwargs) as journal:
+        return journal.data.copy()
+
+
+class TestJournal(object):
+    def test_replay(self, file):
+        with rsdict_journal(file, InitItems, fixkey=False) as journal:
+            data = journal.data
+            assert type(data) is rsdict
+            assert len(journal) == 0
+            data["int"] = 1
+            data["list"] = ["world"]
+            data["hoge"] = 2
+            del data["str"]
+            data.update(float=2.2, int=3)
+            data.pop("hoge")
+            data["str"] = "xyz"
+            data.reset("float")
+            assert len(journal) == 9
+            with pytest.raises(ValueError):
+                with data.transaction():
+                    data["int"] = 4
+                    data["fuga"] = 5
+                    raise ValueError
+            expected = data.to_dict()
+            expected_initial = dict(data.get_initial())
+        assert journal.closed
+        # closed
+        data["int"] = 6
+        assert len(journal) == 13
+
+        data = reopen(file, fixkey=False)
+        assert data.to_dict() == expected
+        assert list(data) == list(expected)
+        assert data.get_initial() == expected_initial
+        # initial value of popped key is kept
+        assert data.get_initial("hoge") == 2
+        assert data.changed_keys() == {"int", "list", "hoge"}
+
+    def test_compact(self, file):
+        journal = rsdict_journal(file, InitItems, max_records=3)
+        journal.data["int"] = 1
+        journal.data["str"] = "xyz"
+        assert len(journal) == 2
+        assert not journal.snapshot_path.exists()
+        journal.data["list"] = ["world"]
+        journal.data["int"] = 2
+        assert len(journal) == 0
+        assert journal.snapshot_path.exists()
+        journal.data["float"] = 2.2
+        assert len(journal) == 1
+        journal.close()
+        journal.close()
+        expected = journal.data.to_dict()
+
+        data = reopen(file)
+        assert data.to_dict() == expected
+        assert data.get_initial() == InitItems
+        assert data.changed_keys() == {"int", "float", "str", "list"}
+
+        # explicit
+        with rsdict_journal(file, InitItems, sync=True) as journal:
+            assert len(journal) == 1
+            journal.compact()
+            assert len(journal) == 0
+            assert file.stat().st_size == 0
+        assert reopen(file).to_dict() == expected
+
+    def test_broken(self, file):
+        with rsdict_journal(file, InitItems) as journal:
+            journal.data["int"] = 1
+            journal.data["int"] = 2
+        size = file.stat().st_size
+        with open(file, "ab") as f:
+            f.write(b"\x10\x00")
+        data = reopen(file)
+        assert data["int"] == 2
+        assert file.stat().st_size == size
+
+        with open(file, "r+b") as f:
+            f.truncate(size - 1)
+        data = reopen(file)
+        assert data["int"] == 1
+
+    def test_broken_snapshot(self, file):
+        with rsdict_journal(file, InitItems) as journal:
+            journal.data["int"] = 1
+            journal.compact()
+        snapshot = journal.snapshot_path
+        buffer = snapshot.read_bytes()
+        for size in (len(buffer) - 1, len(buffer) // 2, 10):
+            snapshot.write_bytes(buffer[:size])
+            with pytest.raises(ValueError):
+                reopen(file)
+        assert not snapshot.with_name(snapshot.name + ".tmp").exists()
+
+        with pytest.raises(ValueError):
+            rsdict.loads(journal.data.dumps()[:-1])
+
+    def test_unpicklable(self, file):
+        with rsdict_journal(
+                file, InitItems, fixkey=False, fixtype=False) as journal:
+            data = journal.data
+            data["int"] = 1
+            size = file.stat().st_size
+            # change is rejected if the records cannot be written
+            with pytest.raises(TypeError):
+                data["int"] = threading.Lock()
+            # (functions are not copied as initial values)
+            with pytest.raises(Exception):
+                data["func"] = lambda: None
+            with pytest.raises(Exception):
+                data.update(str="xyz", func=lambda: None)
+            assert file.stat().st_size == size
+            assert len(journal) == 1
+            assert data.to_dict() == dict(InitItems, int=1)
+            assert list(data) == list(InitItems)
+            assert data.get_initial() == InitItems
+            assert data.changed_keys() == {"int"}
+            # in transaction
+            with pytest.raises(TypeError):
+                with data.transaction():
+                    data["str"] = "xyz"
+                    data["float"] = threading.Lock()
+            assert data.to_dict() == dict(InitItems, int=1)
+            data["int"] = 2
+            expected = data.to_dict()
+        assert reopen(file, fixkey=False, fixtype=False) == expected
+
+    def test_init_raise(self, file):
+        with pytest.raises(TypeError):
+            rsdict_journal(file, InitItems, sync="TRUE")
+        with pytest.raises(TypeError):
+            rsdict_journal(file, InitItems, max_records=1.5)
+        with pytest.raises(TypeError):
+            rsdict_journal(file, list(InitItems))
@@ -8,17 +8,25 @@ pytest -vsl --cov=./src/rsdict --cov-report=term-missing
 import sys
 import math
 import copy
+import pickle
+import weakref
+from collections import OrderedDict
 from itertools import product
 from pathlib import Path, PosixPath, WindowsPath
 
 import pytest
 
 from src.rsdict import (
+    MISSING,
     rsdict,
     rsdict_frozen,
     rsdict_unfix,
     rsdict_fixkey,
-    rsdict_fixtype
+    rsdict_fixtype,
+    rsdict_subtype,
+    rsdict_nested,
+    rsdict_concurrent,
+    rsdict_template,
 )
 from src.rsdict.rsdict import _ERRORMESSAGES, _Options
 
@@ -143,11 +151,17 @@ class TestRsdict(object):
         with pytest.raises(AttributeError):
             data._rsdict__initialized = False
 
-        # overwrite method
-        data.to_dict = 1
-        # broken attribute
-        with pytest.raises(TypeError):
-            _ = data.to_dict()
+        # cannot overwrite method
+        with pytest.raises(AttributeError):
+            data.to_dict = 1
+        # no instance __dict__
+        with pytest.raises(AttributeError):
+            _ = data.__dict__
+        # weak reference
+        ref = weakref.ref(data)
+        assert ref() is data
+        del data
+        assert ref() is None
 
     def test_dict(self, defaultdata, inititems):
         """test attributes equivalent to (built-in) dict"""
@@ -250,6 +264,7 @@ class TestRsdict(object):
         ("path", Path("data"), Path("data")),
         ("path", "data", Path("data")),
         (0, 0, False),
+        (0, "false", False),
     ])
     @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
     def test_set(self, kwargs, key, val_set, val_get, inititems):
@@ -314,6 +329,22 @@ class TestRsdict(object):
             with pytest.raises(TypeError):
                 data["float"] = None
 
+    def test_set_fixtype_addkey(self):
+        data = rsdict_fixtype(dict(a=1))
+        data["b"] = "x"
+        with pytest.raises(TypeError):
+            data["b"] = 2
+        # delete and add again with another type
+        del data["a"]
+        data["a"] = "y"
+        data["a"] = "z"
+        with pytest.raises(TypeError):
+            data["a"] = 3
+        data.clear()
+        data["a"] = 4
+        data["a"] = 5
+        assert data.get_initial() == dict(a=4)
+
     @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
     def test_update(self, kwargs, inititems):
         data = rsdict(inititems, **kwargs)
@@ -358,6 +389,34 @@ class TestRsdict(object):
             assert data["int"] == "5"
             assert data["str"] == 5
 
+    @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
+    def test_update_atomic(self, kwargs, inititems):
+        data = rsdict(inititems, **kwargs)
+        if kwargs["frozen"]:
+            data.update()
+            return
+
+        updates = {"int": 5, "hoge": 1}
+        if kwargs["fixkey"]:
+            with pytest.raises(AttributeError):
+                data.update(updates)
+        else:
+            data.update(updates)
+            assert data["int"] == 5
+            assert data.get_initial("hoge") == 1
+            assert data.changed_keys() == {"int"}
+        data.reset()
+
+        updates = {"int": 5, "float": "x"}
+        if kwargs["fixtype"]:
+            # nothing is updated if any value is invalid
+            with pytest.raises(Exception):
+                data.update(updates)
+            assert not data.is_changed()
+        else:
+            data.update(updates)
+            assert data.changed_keys() == {"int", "float"}
+
     def test_reset(self, defaultdata, inititems):
         assert not defaultdata.is_changed()
         assert defaultdata.to_dict() == defaultdata.get_initial()
@@ -388,6 +447,483 @@ class TestRsdict(object):
         assert not data.is_changed()
         assert data == inititems
 
+    def test_changed_keys(self, inititems):
+        inititems = copy.deepcopy(inititems)
+        data = rsdict(inititems, fixkey=False)
+        assert data.changed_keys() == set()
+
+        # set
+        data["int"] = 9
+        data["str"] = "cde"
+        assert data.changed_keys() == {"int", "str"}
+        # set initial value again
+        data["str"] = inititems["str"]
+        assert data.changed_keys() == {"int"}
+        # change in place
+        data["list"].append("bye")
+        assert data.changed_keys() == {"int", "list"}
+        assert data.is_changed()
+
+        # add and delete keys
+        data["hoge"] = 1
+        assert data.changed_keys() == {"int", "list"}
+        del data["int"]
+        assert data.changed_keys() == {"list"}
+        del data["list"]
+        assert data.changed_keys() == set()
+        assert not data.is_changed()
+
+        # reset
+        data["float"] = 2.2
+        data["dict"]["a"] = 3
+        assert data.changed_keys() == {"float", "dict"}
+        data.reset()
+        assert data.changed_keys() == set()
+        assert data.to_dict() == data.get_initial()
+        # reset values are not initial objects
+        data["dict"]["a"] = 4
+        assert data.get_initial("dict") != data["dict"]
+
+        # pop (initial key is kept)
+        data.reset()
+        assert data.pop("str") == inititems["str"]
+        assert data.popitem()[0] == "hoge"
+        assert data.changed_keys() == {"str", "hoge"}
+        assert data.is_changed()
+        assert data.get_initial("str") == inititems["str"]
+        diff = {key: (initial, value) for key, initial, value in data.diff()}
+        assert diff["str"] == (inititems["str"], MISSING)
+        with pytest.raises(UnboundLocalError):
+            data.reset()
+        # copies and snapshots
+        for data2 in [
+            data.copy(),
+            data.copy(cast=True),
+            copy.deepcopy(data),
+            pickle.loads(pickle.dumps(data)),
+            rsdict.loads(data.dumps()),
+        ]:
+            assert data2.to_dict() == data.to_dict()
+            assert data2.changed_keys() == {"str", "hoge"}
+        patch = data.to_patch()
+        assert patch["popped"] == ["str", "hoge"]
+        data2 = data.copy(reset=True)
+        data2.apply_patch(patch)
+        assert data2.to_dict() == data.to_dict()
+        assert data2.changed_keys() == {"str", "hoge"}
+        data.snapshot("a")
+        data["float"] = 3.3
+        data.restore("a")
+        assert data.changed_keys() == {"str", "hoge"}
+        assert "str" not in data
+
+    def test_initial_copy(self):
+        shared = [1]
+        items = dict(a="abc", b=Path("x"), c=shared, d=shared, e=(shared,))
+        data = rsdict(items)
+        # immutable values are not copied
+        assert data.get_initial("a") is items["a"]
+        assert data.get_initial("b") is items["b"]
+        # mutable values are copied once
+        assert data.get_initial("c") is not shared
+        assert data.get_initial("c") is data.get_initial("d")
+        assert data.get_initial("e")[0] is data.get_initial("c")
+        shared.append(2)
+        assert data.get_initial("c") == [1]
+        assert data.is_changed("c")
+
+    def test_reset_frozen(self, inititems):
+        data = rsdict(copy.deepcopy(inititems), frozen=True)
+        # nothing to reset
+        data.reset()
+        data.reset("list")
+        # change in place
+        data["list"].append("bye")
+        assert data.changed_keys() == {"list"}
+        with pytest.raises(AttributeError):
+            data.reset()
+
+    def test_transaction(self, inititems):
+        data = rsdict(inititems, fixkey=False, cast=True)
+        data["int"] = 1
+        expected = data.to_dict()
+
+        # commit
+        with data.transaction() as data_txn:
+            assert data_txn is data
+            data["float"] = 2.2
+        assert data["float"] == 2.2
+        assert data.changed_keys() == {"int", "float"}
+        data.reset("float")
+        assert data.to_dict() == expected
+
+        # rollback
+        with pytest.raises(ValueError):
+            with data.transaction():
+                data["int"] = 2
+                data["str"] = "xyz"
+                data.update({"float": 3.3, "hoge": 1})
+                del data["list"]
+                data.reset("int")
+                data["float"] = "abc"
+        assert data.to_dict() == expected
+        assert list(data) == list(expected)
+        assert data.get_initial() == inititems
+        assert list(data.get_initial()) == list(inititems)
+        assert data.changed_keys() == {"int"}
+        data["float"] = 4.4
+        assert data.is_changed("float")
+
+        # nested
+        with data.transaction():
+            data["int"] = 3
+            with pytest.raises(KeyError):
+                with data.transaction():
+                    data["int"] = 4
+                    data.pop("str")
+                    raise KeyError
+            assert data["int"] == 3
+            assert data["str"] == inititems["str"]
+            with data.transaction():
+                data["str"] = "xyz"
+        assert data["int"] == 3
+        assert data["str"] == "xyz"
+        with pytest.raises(KeyError):
+            with data.transaction():
+                data.clear()
+                with data.transaction():
+                    data["hoge"] = 0
+                raise KeyError
+        assert data["str"] == "xyz"
+        assert data.get_initial() == inititems
+
+        # copy in transaction
+        data2 = data.copy(reset=True)
+        with pytest.raises(KeyError):
+            with data2.transaction():
+                data2["int"] = 5
+                data3 = data2.copy()
+                del data2["list"]
+                raise KeyError
+        assert not data2.is_changed()
+        assert data3["int"] == 5
+        data3["int"] = 6
+
+    def test_snapshot(self, inititems):
+        data = rsdict(copy.deepcopy(inititems), fixkey=False)
+        data["int"] = 1
+        data["list"].append("world")
+        data.snapshot("a")
+        expected_a = copy.deepcopy(data.to_dict())
+        assert data.snapshots() == ["a"]
+
+        data["int"] = 2
+        data["str"] = "xyz"
+        data["list"].append("!")
+        data.snapshot("b")
+        expected_b = copy.deepcopy(data.to_dict())
+
+        # restore (changed values only)
+        data.restore("a")
+        assert data.to_dict() == expected_a
+        assert data.changed_keys() == {"int", "list"}
+        data["list"].append("?")
+        assert data.to_dict() != expected_a
+        data.restore("a")
+        assert data.to_dict() == expected_a
+        data.restore("b")
+        assert data.to_dict() == expected_b
+        data.reset()
+        data.restore("b")
+        assert data.to_dict() == expected_b
+        with pytest.raises(KeyError):
+            data.restore("c")
+
+        # restore keys
+        del data["float"]
+        data["hoge"] = 1
+        data.restore("a")
+        assert data.to_dict() == expected_a
+        assert list(data) == list(expected_a)
+        assert data.get_initial() == inititems
+        data.reset()
+        assert data.to_dict() == inititems
+
+        # overwrite and delete
+        data["int"] = 3
+        data.snapshot("a")
+        data.reset()
+        data.restore("a")
+        assert data["int"] == 3
+        data.delete_snapshot("a")
+        assert data.snapshots() == ["b"]
+        with pytest.raises(KeyError):
+            data.delete_snapshot("a")
+
+        # copy does not share snapshots
+        assert data.copy().snapshots() == []
+
+        # frozen
+        data = rsdict(copy.deepcopy(inititems), frozen=True)
+        data.snapshot("a")
+        data.restore("a")
+        data.undo()
+        data["list"].append("world")
+        with pytest.raises(AttributeError):
+            data.restore("a")
+        assert data["list"] == ["hello", "world"]
+
+    def test_diff(self, inititems):
+        data = rsdict(copy.deepcopy(inititems), fixkey=False)
+        assert list(data.diff()) == []
+        assert data.to_patch() == dict(values=dict(), removed=list())
+
+        data["int"] = 1
+        data["float"] = data["float"]
+        data["list"].append("world")
+        data["hoge"] = 2
+        del data["str"]
+        del data["tuple"]
+        data["tuple"] = (5, 6)
+        del data["path"]
+        data["path"] = Path("./src")
+        assert sorted(data.diff(), key=str) == sorted([
+            ("int", 0, 1),
+            ("list", ["hello"], ["hello", "world"]),
+            ("hoge", MISSING, 2),
+            ("str", "abc", MISSING),
+            ("path", Path("./lib"), Path("./src")),
+        ], key=str)
+        patch = data.to_patch()
+        assert patch["values"] == dict(
+            int=1, list=["hello", "world"], hoge=2, path=Path("./src"))
+        assert patch["removed"] == ["str"]
+        assert repr(MISSING) == "MISSING"
+        assert pickle.loads(pickle.dumps(MISSING)) is MISSING
+
+        # apply
+        data2 = rsdict(copy.deepcopy(inititems), fixkey=False)
+        data2.apply_patch(pickle.loads(pickle.dumps(patch)))
+        assert data2.to_dict() == data.to_dict()
+        assert data2.to_patch() == patch
+        data2.apply_patch(patch)
+        assert data2.to_dict() == data.to_dict()
+
+        # add a key again
+        del data2["hoge"]
+        data2["str"] = "abc"
+        assert sorted(data2.diff(), key=str) == sorted([
+            ("int", 0, 1),
+            ("list", ["hello"], ["hello", "world"]),
+            ("path", Path("./lib"), Path("./src")),
+        ], key=str)
+
+        # raise
+        data3 = rsdict(copy.deepcopy(inititems))
+        with pytest.raises(AttributeError):
+            data3.apply_patch(patch)
+        with pytest.raises(TypeError):
+            data3.apply_patch(dict(values=dict(int="1", str=""), removed=[]))
+        assert not data3.is_changed()
+        data3.apply_patch(dict(values=dict(int=1), removed=["hoge"]))
+        assert data3["int"] == 1
+        data3 = rsdict(copy.deepcopy(inititems), frozen=True)
+        with pytest.raises(AttributeError):
+            data3.apply_patch(patch)
+
+    @pytest.mark.parametrize("use_mmap", [False, True])
+    def test_save(self, inititems, tmp_path, use_mmap):
+        file = tmp_path / "data.rsdict"
+        data = rsdict(copy.deepcopy(inititems), fixkey=False, cast=True)
+        data["int"] = 1
+        data["list"].append("world")
+        data["hoge"] = [2]
+        del data["str"]
+        data.save(file)
+        data2 = rsdict.load(str(file), mmap=use_mmap)
+        assert type(data2) is rsdict
+        assert data2 == data
+        assert list(data2) == list(data)
+        assert data2.get_initial() == data.get_initial()
+        assert repr(data2) == repr(data)
+        assert data2.changed_keys() == {"int", "list"}
+        assert sorted(data2.diff(), key=str) == sorted(data.diff(), key=str)
+
+        # current values are not shared with initial values
+        data2["list"].append("!")
+        data2["dict"]["a"] = 3
+        assert data2.get_initial("list") == ["hello"]
+        assert data2.get_initial("dict") == dict(a=2)
+        data2.reset()
+        assert data2.to_dict() == data2.get_initial()
+        data2["float"] = "2.5"
+        assert data2["float"] == 2.5
+
+        # frozen
+        data = rsdict_frozen(copy.deepcopy(inititems))
+        data.save(file)
+        data2 = rsdict_frozen.load(file, mmap=use_mmap)
+        assert type(data2) is rsdict_frozen
+        assert data2 == inititems
+        assert not data2.is_changed()
+        with pytest.raises(AttributeError):
+            data2["int"] = 1
+
+        # nested
+        data = rsdict_nested(dict(a=dict(b=[1]), c=dict(d=1)))
+        data["a"]["b"].append(2)
+        data.save(file)
+        data2 = rsdict_nested.load(file, mmap=use_mmap)
+        assert data2.to_dict() == dict(a=dict(b=[1, 2]), c=dict(d=1))
+        data2.reset()
+        assert data2.to_dict() == dict(a=dict(b=[1]), c=dict(d=1))
+
+    def test_load_raise(self, tmp_path):
+        file = tmp_path / "data.json"
+        file.write_bytes(b"{}")
+        with pytest.raises(ValueError):
+            rsdict.load(file)
+        with pytest.raises(TypeError):
+            rsdict.load(file, mmap="TRUE")
+
+    @pytest.mark.parametrize(
+        "cls", [rsdict, rsdict_frozen, rsdict_unfix, rsdict_concurrent])
+    def test_pickle(self, inititems, cls):
+        data = cls(copy.deepcopy(inititems))
+        data["list"].append("world")
+        if not data.frozen:
+            data["int"] = 1
+        data2 = pickle.loads(pickle.dumps(data))
+        assert type(data2) is cls
+        assert data2 == data
+        assert repr(data2) == repr(data)
+        assert data2.get_initial() == inititems
+        assert data2.changed_keys() == data.changed_keys()
+
+        # current values are not shared with initial values
+        data2["list"].append("!")
+        data2["dict"]["a"] = 3
+        assert data2.get_initial() == inititems
+        assert data["list"] == ["hello", "world"]
+        if not data2.frozen:
+            data2.reset()
+            assert data2.to_dict() == inititems
+
+    @pytest.mark.parametrize(
+        "cls", [rsdict, rsdict_frozen, rsdict_unfix, rsdict_concurrent])
+    def test_deepcopy(self, inititems, cls):
+        data = cls(copy.deepcopy(inititems))
+        data["list"].append("world")
+        data2 = copy.deepcopy(data)
+        assert type(data2) is cls
+        assert data2 == data
+        assert data2.get_initial() == inititems
+        assert data2.changed_keys() == {"list"}
+        data2["list"].append("!")
+        data2["dict"]["a"] = 3
+        assert data["list"] == ["hello", "world"]
+        assert data["dict"] == inititems["dict"]
+        assert data2.get_initial() == inititems
+
+        # values referring to the instance
+        data = rsdict(dict(a=[]))
+        data["a"].append(data)
+        data2 = copy.deepcopy(data)
+        assert data2["a"][0] is data2
+
+    def test_subscribe(self, inititems):
+        data = rsdict(copy.deepcopy(inititems), fixkey=False)
+        calls = list()
+        calls_int = list()
+
+        def func(rd, keys):
+            assert rd is data
+            calls.append(keys)
+
+        data.subscribe(func)
+        data.subscribe(lambda rd, keys: calls_int.append(keys), keys=["int"])
+        data["int"] = 1
+        data.update(float=2.2, str="xyz", hoge=1)
+        data.reset()
+        del data["hoge"]
+        data.pop("str")
+        with pytest.raises(TypeError):
+            data["int"] = "2"
+        assert calls == [
+            {"int"},
+            {"float", "str", "hoge"},
+            {"int", "float", "str"},
+            {"hoge"},
+            {"str"},
+        ]
+        assert all(type(keys) is frozenset for keys in calls)
+        assert calls_int == [{"int"}, {"int"}]
+
+        # in transaction
+        calls.clear()
+        with pytest.raises(ValueError):
+            with data.transaction():
+                data["int"] = 3
+                raise ValueError
+        assert calls == [{"int"}, {"int"}]
+        assert data["int"] == 0
+
+        data.unsubscribe(func)
+        with pytest.raises(ValueError):
+            data.unsubscribe(func)
+        data["int"] = 4
+        assert len(calls) == 2
+        assert calls_int[-1] == {"int"}
+
+    def test_undo(self, inititems):
+        data = rsdict(inititems, fixkey=False)
+        with pytest.raises(IndexError):
+            data.undo()
+        with pytest.raises(IndexError):
+            data.redo()
+
+        data.checkpoint()
+        data["int"] = 1
+        data.checkpoint()
+        data["int"] = 2
+        data["hoge"] = 3
+        data.undo()
+        assert data["int"] == 1
+        assert "hoge" not in data
+        data.undo()
+        assert not data.is_changed()
+        with pytest.raises(IndexError):
+            data.undo()
+        data.redo()
+        assert data["int"] == 1
+        data.redo()
+        assert data["int"] == 2
+        assert data["hoge"] == 3
+        with pytest.raises(IndexError):
+            data.redo()
+
+        # redo is cleared by checkpoint
+        data.undo()
+        data.checkpoint()
+        with pytest.raises(IndexError):
+            data.redo()
+
+        # undo restore
+        data.snapshot("a")
+        data["int"] = 5
+        data.restore("a")
+        assert data["int"] == 1
+        data.undo()
+        assert data["int"] == 5
+
+        # in transaction
+        with pytest.raises(KeyError):
+            with data.transaction():
+                data.undo()
+                assert data["int"] == 1
+                raise KeyError
+        assert data["int"] == 5
+
     @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
     def test_copy_option(self, kwargs, defaultdata):
         # change option
@@ -431,6 +967,54 @@ class TestRsdict(object):
             assert data2.to_dict() == data.to_dict()
             assert data2.get_initial() == data.to_dict()
 
+    def test_copy_subclass(self, inititems):
+        class rsdict_sub(rsdict):
+            def __init__(self, items, frozen=False, fixkey=True,
+                         fixtype=True, cast=False):
+                super().__init__(
+                    items, frozen=frozen, fixkey=fixkey,
+                    fixtype=fixtype, cast=cast)
+
+        data = rsdict_sub(inititems)
+        data["int"] = 5
+        data2 = data.copy(frozen=True)
+        assert type(data2) is rsdict_sub
+        assert data2.frozen
+        assert data2.get_initial("int") == 5
+
+    def test_copy_share(self, inititems):
+        data = rsdict(inititems, fixkey=False)
+        data["int"] = 5
+        data2 = data.copy()
+        data3 = data.copy(reset=True, fixtype=False)
+        # initial values are shared
+        assert data2.get_initial() is data.get_initial()
+        assert data3.get_initial() is data.get_initial()
+        assert data2.changed_keys() == {"int"}
+        assert data3.changed_keys() == set()
+        # mutable values are not shared
+        data2["list"].append("bye")
+        assert data["list"] == inititems["list"]
+        assert data2.get_initial("list") == inititems["list"]
+
+        # add and delete keys
+        data2["hoge"] = 1
+        del data3["int"]
+        assert data2.get_initial() is not data.get_initial()
+        assert data3.get_initial() is not data.get_initial()
+        assert "hoge" not in data.get_initial()
+        assert "int" in data.get_initial()
+        assert data.get_initial() == inititems
+        data["fuga"] = 2
+        assert data.get_initial("fuga") == 2
+
+        # validate current values with new options
+        data = rsdict(inititems, fixtype=False)
+        data["int"] = "5"
+        with pytest.raises(TypeError):
+            data.copy(fixtype=True)
+        assert data.copy(fixtype=True, cast=True)["int"] == 5
+
     @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
     def test_delkey(self, kwargs, inititems):
         data = rsdict(inititems, **kwargs)
@@ -452,7 +1036,17 @@ class TestRsdict(object):
             else:
                 k, v = data.popitem()
                 assert k not in data
+            # popped item is logged before it is deleted
+            logged = list()
+            data._add_listener(
+                lambda rd, keys: logged.extend((k, k in rd) for k in keys),
+                before=True,
+            )
+            k, v = data.popitem()
+            assert logged == [(k, True)]
             data.clear()
+            with pytest.raises(KeyError):
+                data.popitem()
             assert data.to_dict() == dict()
             assert data.get_initial() == dict()
             data.reset()
@@ -525,7 +1119,10 @@ class TestRsdict(object):
         data = rsdict(inititems)
         del data._rsdict__inititems["str"]
         data._rsdict__inititems["str"] = "xxx"
+        # reset() checks tracked keys only
         data.reset()
+        assert data["str"] == inititems["str"]
+        data.reset("str")
         assert data["str"] == "xxx"
 
         # add initial key direct
@@ -578,6 +1175,7 @@ class TestSubclass(object):
     def test_init(self, rsdict_sc, kwargs, inititems):
         data = rsdict_sc(inititems)
         assert data.to_dict() == inititems
+        assert not hasattr(data, "__dict__")
         for kw in kwargs.keys():
             assert data.__getattribute__(kw) == kwargs[kw]
 
@@ -599,3 +1197,237 @@ class TestSubclass(object):
             assert data.is_changed()
         for kw in kwargs.keys():
             assert data.__getattribute__(kw) == kwargs[kw]
+
+
+class TestNested(object):
+    @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
+    def test_get(self, kwargs):
+        items = dict(a=dict(b=dict(c=[1]), x=1), y=dict(z=2), n=0)
+        expected = copy.deepcopy(items)
+        data = rsdict_nested(items, **kwargs)
+        # not copied until accessed
+        assert data.get_initial("y") is items["y"]
+        assert not data.is_changed()
+
+        child = data["a"]
+        assert type(child) is rsdict_nested
+        assert data["a"] is child
+        assert data.get("a") is child
+        assert data.get("hoge", 1) == 1
+        for name, value in kwargs.items():
+            assert child.__getattribute__(name) == value
+        assert child == expected["a"]
+        assert child["b"]["c"] == [1]
+        assert data.to_dict() == expected
+        assert not data.is_changed()
+
+        if kwargs["frozen"]:
+            with pytest.raises(AttributeError):
+                child["x"] = 2
+        else:
+            child["b"]["c"].append(2)
+            assert data.is_changed()
+            assert data.changed_keys() == {"a"}
+            assert child.is_changed()
+            assert not data["y"].is_changed()
+            assert items == expected
+            data.reset()
+            assert not data.is_changed()
+            assert data["a"]["b"]["c"] == [1]
+            if kwargs["fixtype"] and not kwargs["cast"]:
+                with pytest.raises(TypeError):
+                    data["a"]["x"] = "2"
+            else:
+                data["a"]["x"] = "2"
+                assert data.changed_keys() == {"a"}
+        assert items == expected
+
+    def test_copy(self):
+        data = rsdict_nested(dict(a=dict(b=[1]), c=dict(d=1)), fixkey=False)
+        data["a"]["b"].append(2)
+        data["a"]["e"] = 3
+        assert repr(data) == (
+            "rsdict({'a': {'b': [1, 2], 'e': 3}, 'c': {'d': 1}}, "
+            "frozen=False, fixkey=False, fixtype=True, cast=False)"
+        )
+        data2 = copy.deepcopy(data)
+        assert data2 == data
+        data2["a"]["b"].append(3)
+        assert data["a"]["b"] == [1, 2]
+        data.snapshot("s")
+        data.reset()
+        assert data.to_dict() == dict(a=dict(b=[1]), c=dict(d=1))
+        data.restore("s")
+        assert data.to_dict() == dict(a=dict(b=[1, 2], e=3), c=dict(d=1))
+        assert data.copy() == data
+
+        # nested rsdicts are copied (values are copied shallowly)
+        data["c"]["d"] = 2
+        for data2 in [data.copy(), data.copy(cast=True), copy.deepcopy(data)]:
+            data2["c"]["d"] = 99
+            data2["a"]["e"] = 99
+            assert data.to_dict() == dict(
+                a=dict(b=[1, 2], e=3), c=dict(d=2))
+        assert data.copy(fixtype=False)["c"].fixtype is False
+
+    @pytest.mark.parametrize("fixkey", [True, False])
+    def test_set_dict(self, fixkey):
+        items = dict(a=dict(b=1, c=dict(d=1)), x=1)
+        data = rsdict_nested(items, fixkey=fixkey, cast=True)
+        # validated as the nested rsdict
+        with pytest.raises(ValueError):
+            data["a"] = dict(b="x", c=dict(d=1))
+        with pytest.raises(ValueError):
+            data.update(a=dict(b=1, c=dict(d="x")))
+        if fixkey:
+            with pytest.raises(AttributeError):
+                data["a"] = dict(zzz=1)
+            with pytest.raises(AttributeError):
+                data["a"] = dict(b=1)
+            with pytest.raises(AttributeError):
+                data.update(x=2, a=dict(b=1, c=dict(e=1)))
+            assert not data.is_changed()
+        else:
+            data["a"] = dict(zzz=1)
+            assert data["a"].to_dict() == dict(zzz=1)
+        data["a"] = dict(b="2", c=dict(d="3"))
+        assert data.to_dict() == dict(a=dict(b=2, c=dict(d=3)), x=1)
+        assert items == dict(a=dict(b=1, c=dict(d=1)), x=1)
+
+
+class TestSubtype(object):
+    @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
+    def test_set(self, kwargs):
+        data = rsdict_subtype(dict(a=1, b=dict(), c="x"), **kwargs)
+        if kwargs["frozen"]:
+            with pytest.raises(AttributeError):
+                data["a"] = True
+            return
+        # subclass of initial type is not cast
+        data["a"] = True
+        assert data["a"] is True
+        data["b"] = OrderedDict(x=1)
+        assert type(data["b"]) is OrderedDict
+        data.update(a=False, b=dict())
+        assert data["a"] is False
+        assert data.changed_keys() == {"a"}
+
+        if not kwargs["fixtype"]:
+            data["c"] = 1
+        elif kwargs["cast"]:
+            data["c"] = 1
+            assert data["c"] == "1"
+            data.update(a="2", c=3)
+            assert data.to_dict() == dict(a=2, b=dict(), c="3")
+        else:
+            with pytest.raises(TypeError):
+                data["c"] = 1
+            with pytest.raises(TypeError):
+                data.update(a=True, c=1)
+            assert data["a"] is False
+
+    def test_cache(self):
+        data = rsdict_subtype(dict(a=1), fixkey=False)
+        data2 = data.copy()
+        data["a"] = True
+        assert data.get_initial()._verdicts == {("a", bool): True}
+        # shared with copied instance
+        assert data2.get_initial()._verdicts == {("a", bool): True}
+        with pytest.raises(TypeError):
+            data["a"] = 1.5
+        # cleared when the key is deleted
+        del data["a"]
+        data["a"] = 1.5
+        with pytest.raises(TypeError):
+            data["a"] = True
+        data2["a"] = False
+        assert data2["a"] is False
+
+
+class TestTemplate(object):
+    @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
+    def test_call(self, kwargs, inititems):
+        template = rsdict_template(inititems, **kwargs)
+        data = template()
+        data2 = template()
+        assert type(data) is rsdict
+        assert data == rsdict(inititems, **kwargs)
+        assert repr(data) == repr(rsdict(inititems, **kwargs))
+        assert not data.is_changed()
+        assert template.get_initial() == inititems
+        assert template.get_initial("int") == inititems["int"]
+        # initial values are shared
+        assert data.get_initial() is data2.get_initial()
+        # current values are not shared
+        assert data["list"] is not data2["list"]
+        data["list"].append("bye")
+        assert data2["list"] == inititems["list"]
+        assert template()["list"] == inititems["list"]
+
+        if not kwargs["frozen"]:
+            data["int"] = 5
+            assert data2["int"] == inititems["int"]
+        if not kwargs["frozen"] and not kwargs["fixkey"]:
+            data["hoge"] = 1
+            del data2["int"]
+            assert template.get_initial() == inititems
+
+        # repr()
+        template_eval = eval(repr(template))
+        assert template_eval() == template()
+
+    def test_init_raise(self, inititems):
+        with pytest.raises(TypeError):
+            rsdict_template(list(inititems))
+        with pytest.raises(TypeError):
+            rsdict_template(inititems, frozen="TRUE")
+        template = rsdict_template(inititems)
+        with pytest.raises(AttributeError):
+            template.hoge = 0
+
+    @pytest.mark.parametrize(*ParamKwargs, ids=ParamKwargNames)
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_validate_many(self, kwargs, inititems, workers):
+        template = rsdict_template(inititems, **kwargs)
+        items = [
+            dict(int=1, str="xyz"),
+            dict(int="2"),
+            dict(hoge=1),
+            dict(int="x"),
+            "int",
+        ]
+        results = list(template.validate_many(
+            iter(items), workers=workers, chunksize=2))
+        assert len(results) == len(items)
+        for item, result in zip(items, results):
+            if not isinstance(item, dict):
+                assert isinstance(result, TypeError)
+                continue
+            # same as update()
+            data = template()
+            try:
+                data.update(item)
+            except Exception as e:
+                assert type(result) is type(e)
+                assert str(result) == str(e)
+            else:
+                assert result == {key: data[key] for key in item}
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_validate_many_empty(self, inititems, workers):
+        template = rsdict_template(inititems, frozen=True)
+        results = list(template.validate_many(
+            [dict(), dict(int=1)], workers=workers))
+        # same as update()
+        template().update(dict())
+        assert results[0] == dict()
+        assert isinstance(results[1], AttributeError)
+
+    def test_validate_many_raise(self, inititems):
+        template = rsdict_template(inititems)
+        with pytest.raises(TypeError):
+            template.validate_many([], workers="2")
+        with pytest.raises(ValueError):
+            template.validate_many([], workers=0)
+        with pytest.raises(ValueError):
+            template.validate_many([], chunksize=0)
@@ -0,0 +1,91 @@
+"""pytest
+
+Requirements:
+pip install -r requirements/test.txt
+Usage:
+pytest -vsl --cov=./src/rsdict --cov-report=term-missing
+"""
+import multiprocessing
+
+import pytest
+
+from src.rsdict import rsdict, rsdict_frozen, rsdict_shared
+
+pytest.importorskip("multiprocessing.shared_memory")
+
+
+InitItems = {
+    "int": 0,
+    "list": ["hello"],
+    "str": "abc",
+}
+
+
+def read_worker(name):
+    shared = rsdict_shared.attach(name)
+    try:
+        data = shared.data
+        return shared.generation, data.to_dict(), data.frozen
+    finally:
+        shared.close()
+
+
+class TestShared(object):
+    def test_publish(self):
+        with rsdict_shared() as shared:
+            assert shared.generation == 0
+            worker = rsdict_shared.attach(shared.name)
+            with pytest.raises(LookupError):
+                worker.data
+            assert shared.publish(rsdict_frozen(InitItems)) == 1
+
+            assert worker.is_updated()
+            data = worker.data
+            assert type(data) is rsdict
+            assert data.frozen
+            assert data == InitItems
+            assert not worker.is_updated()
+            assert worker.data is data
+            with pytest.raises(AttributeError):
+                data["int"] = 1
+
+            # republish
+            data2 = rsdict(InitItems)
+            data2["int"] = 1
+            shared.publish(data2)
+            shared.publish(data2)
+            assert shared.generation == 3
+            assert worker.is_updated()
+            assert worker.data["int"] == 1
+            assert worker.data.get_initial("int") == 0
+            assert worker.data.changed_keys() == {"int"}
+            with pytest.raises(ValueError):
+                worker.publish(data2)
+            worker.close()
+            worker.close()
+
+    def test_init_raise(self):
+        with pytest.raises(FileNotFoundError):
+            rsdict_shared.attach("rsdict_notfound")
+        with rsdict_shared() as shared:
+            with pytest.raises(FileExistsError):
+                rsdict_shared(shared.name)
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="fork is not available",
+    )
+    def test_process(self):
+        ctx = multiprocessing.get_context("fork")
+        with rsdict_shared() as shared:
+            shared.publish(rsdict_frozen(InitItems))
+            with ctx.Pool(2) as pool:
+                results = pool.map(read_worker, [shared.name] * 4)
+            assert results == [(1, InitItems, True)] * 4
+            # shared memory is not unlinked by workers
+            data = rsdict(InitItems, fixkey=False)
+            data["hoge"] = 1
+            shared.publish(data)
+            with ctx.Pool(2) as pool:
+                results = pool.map(read_worker, [shared.name] * 2)
+            assert results[0][:2] == (2, dict(InitItems, hoge=1))
@@ -0,0 +1,216 @@
+"""pytest
+
+Requirements:
+pip install -r requirements/test.txt
+Usage:
+pytest -vsl --cov=./src/rsdict --cov-report=term-missing
+"""
+import copy
+from pathlib import Path
+
+import pytest
+
+from src.rsdict import rsdict, rsdict_table
+from src.rsdict import table as table_module
+
+
+Columns = {
+    "int": [0, 1, 2],
+    "float": [0.5, 1.5, 2.5],
+    "bool": [True, False, True],
+    "str": ["a", "b", "c"],
+    "list": [[1], [2], [3]],
+    "path": [Path("a"), Path("b"), Path("c")],
+}
+
+
+@pytest.fixture(scope="function", params=["numpy", "array"])
+def numpy(request, monkeypatch):
+    if request.param == "numpy":
+        return pytest.importorskip("numpy")
+    else:
+        # use array.array instead of numpy.ndarray
+        monkeypatch.setattr(table_module, "np", None)
+        return None
+
+
+@pytest.fixture(scope="function", autouse=False)
+def columns():
+    return copy.deepcopy(Columns)
+
+
+def records(columns):
+    return [
+        {key: values[i] for key, values in columns.items()}
+        for i in range(len(columns["int"]))
+    ]
+
+
+class TestTable(object):
+    def test_init(self, numpy, columns):
+        table = rsdict_table(columns)
+        assert len(table) == 3
+        assert table.keys() == list(columns)
+        for key in columns:
+            assert table.column(key) == columns[key]
+            assert table.get_initial(key) == columns[key]
+            assert type(table.column(key)[0]) is type(columns[key][0])
+        assert list(table.is_changed()) == [False] * 3
+
+        table = rsdict_table.from_records(records(columns))
+        for key in columns:
+            assert table.column(key) == columns[key]
+        assert len(rsdict_table(dict())) == 0
+        assert len(rsdict_table.from_records([])) == 0
+
+        if numpy is not None:
+            table = rsdict_table(dict(x=numpy.arange(3)))
+            assert table.column("x") == [0, 1, 2]
+
+    def test_init_raise(self, numpy, columns):
+        with pytest.raises(TypeError):
+            rsdict_table(list(columns))
+        with pytest.raises(TypeError):
+            rsdict_table(columns, frozen="TRUE")
+        with pytest.raises(ValueError):
+            rsdict_table(dict(a=[1, 2], b=[1]))
+        # type of the first value
+        with pytest.raises(TypeError):
+            rsdict_table(dict(a=[1, "2"]))
+        assert rsdict_table(dict(a=[1, "2"]), cast=True).column("a") == [1, 2]
+        assert rsdict_table(
+            dict(a=[1, "2"]), fixtype=False).column("a") == [1, "2"]
+        # keys of records
+        rows = records(columns)
+        del rows[1]["int"]
+        with pytest.raises(AttributeError):
+            rsdict_table.from_records(rows)
+
+    def test_row(self, numpy, columns):
+        table = rsdict_table(columns)
+        row = table[1]
+        assert row == records(columns)[1]
+        assert row.to_dict() == records(columns)[1]
+        assert table[-1] == records(columns)[-1]
+        assert [r["int"] for r in table] == columns["int"]
+        assert len(row) == len(columns)
+        assert list(row) == list(columns)
+        assert repr(row) == repr(rsdict(records(columns)[1]))
+        assert str(row) == str(rsdict(records(columns)[1]))
+        with pytest.raises(IndexError):
+            table[3]
+
+        # set
+        row["int"] = 5
+        row.set("str", "x")
+        assert row["int"] == 5
+        assert table.column("int") == [0, 5, 2]
+        assert row.is_changed()
+        assert row.is_changed("int")
+        assert not row.is_changed("float")
+        assert row.changed_keys() == {"int", "str"}
+        assert row.get_initial("int") == 1
+        assert row.get_initial() == records(columns)[1]
+        assert list(table.is_changed()) == [False, True, False]
+        assert list(table.is_changed("str")) == [False, True, False]
+        assert list(table.is_changed("float")) == [False] * 3
+        with pytest.raises(TypeError):
+            row["int"] = "6"
+        with pytest.raises(AttributeError):
+            row["hoge"] = 1
+        with pytest.raises(AttributeError):
+            del row["int"]
+
+        # reset
+        row.reset("int")
+        assert row["int"] == 1
+        row.reset()
+        assert not row.is_changed()
+        row["list"].append(4)
+        assert row.is_changed("list")
+        row.reset_all()
+        assert row["list"] == [2]
+        # use update() to set values of a row
+        assert not hasattr(row, "set_all")
+
+    def test_set_column(self, numpy, columns):
+        table = rsdict_table(columns, cast=True)
+        table.set_column("int", ["3", 4.0, True])
+        assert table.column("int") == [3, 4, 1]
+        table.set_column("bool", [0, 1, 0])
+        assert table.column("bool") == [False, True, False]
+        table.set_column("path", ["x", "y", "z"])
+        assert table.column("path") == [Path("x"), Path("y"), Path("z")]
+        # all or nothing
+        with pytest.raises(ValueError):
+            table.set_column("float", ["1.0", "x", "2.0"])
+        assert table.column("float") == columns["float"]
+        with pytest.raises(ValueError):
+            table.set_column("float", [1.0])
+        if numpy is not None:
+            table.set_column("float", numpy.array([1, 2, 3]))
+            assert table.column("float") == [1.0, 2.0, 3.0]
+
+        table = rsdict_table(columns)
+        with pytest.raises(TypeError):
+            table.set_column("int", ["3", 4, 5])
+        if numpy is not None:
+            with pytest.raises(TypeError):
+                table.set_column("int", numpy.array([1.0, 2.0, 3.0]))
+
+    def test_reset(self, numpy, columns):
+        table = rsdict_table(columns)
+        table.set_column("int", [5, 6, 7])
+        table[0]["str"] = "x"
+        table[2]["list"] = [9]
+        assert list(table.is_changed()) == [True, True, True]
+
+        table.reset([False, True, False])
+        assert list(table.is_changed()) == [True, False, True]
+        table.reset([2])
+        assert list(table.is_changed()) == [True, False, False]
+        if numpy is not None:
+            table.reset(numpy.array([True, False, False]))
+        else:
+            table.reset()
+        assert list(table.is_changed()) == [False, False, False]
+        assert table.column("int") == columns["int"]
+
+        table.set_column("int", [5, 6, 7])
+        table.reset()
+        assert table.column("int") == columns["int"]
+
+    def test_nan(self, numpy):
+        nan = float("nan")
+        table = rsdict_table(dict(float=[nan, 1.0]))
+        assert list(table.is_changed()) == [False, False]
+        assert not table[0].is_changed()
+        table[0]["float"] = 2.0
+        table[1]["float"] = nan
+        assert list(table.is_changed()) == [True, True]
+        table.reset()
+        assert list(table.is_changed()) == [False, False]
+
+    @pytest.mark.parametrize("dtype", ["int32", "uint8", "float32"])
+    def test_dtype(self, dtype):
+        np = pytest.importorskip("numpy")
+        table = rsdict_table(dict(a=np.arange(3, dtype=dtype)))
+        assert table.column("a") == [0, 1, 2]
+        table[1]["a"] = table[1]["a"] + 1
+        assert list(table.is_changed()) == [False, True, False]
+        table.set_column("a", np.arange(3, dtype=dtype))
+        assert list(table.is_changed()) == [False, False, False]
+        with pytest.raises(TypeError):
+            table.set_column("a", np.array(["0", "1", "2"]))
+
+    def test_frozen(self, numpy, columns):
+        table = rsdict_table(columns, frozen=True)
+        with pytest.raises(AttributeError):
+            table[0]["int"] = 5
+        with pytest.raises(AttributeError):
+            table.set_column("int", [5, 6, 7])
+        table.reset()
+        table[0].reset()
+        table[0]["list"].append(2)
+        with pytest.raises(AttributeError):
+            table.reset()
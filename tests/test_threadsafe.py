@@ -0,0 +1,210 @@
+"""pytest
+
+Requirements:
+pip install -r requirements/test.txt
+Usage:
+pytest -vsl --cov=./src/rsdict --cov-report=term-missing
+"""
+import sys
+import threading
+
+import pytest
+
+from src.rsdict import rsdict_concurrent, rsdict_view
+
+
+N_THREADS = 8
+N_LOOP = 2000
+
+
+def run_threads(target, n: int = N_THREADS) -> None:
+    errors = list()
+
+    def run(i):
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+@pytest.fixture(autouse=True)
+def switchinterval():
+    # switch threads frequently (ignored by free-threaded build)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class TestConcurrent(object):
+    def test_init(self):
+        data = rsdict_concurrent(dict(a=1))
+        assert type(data.copy()) is rsdict_concurrent
+        assert type(data.copy(frozen=True)) is rsdict_concurrent
+        data2 = data.copy()
+        data2["a"] = 2
+        assert list(data2.diff()) == [("a", 1, 2)]
+        with data2.transaction():
+            data2["a"] = 3
+        assert data2["a"] == 3
+
+    def test_addkey(self):
+        data = rsdict_concurrent(dict(), fixkey=False)
+
+        def target(i):
+            for j in range(N_LOOP):
+                key = (i, j % 10)
+                if key in data:
+                    del data[key]
+                else:
+                    data[key] = j
+                data.is_changed()
+
+        run_threads(target)
+        assert list(data.keys()) == list(data.get_initial().keys())
+        assert not data.is_changed()
+
+    def test_setitem(self):
+        data = rsdict_concurrent(
+            {i: 0 for i in range(N_THREADS)}, fixkey=False, cast=True)
+
+        def target(i):
+            for j in range(N_LOOP):
+                data[i] = str(j)
+                data.update({i: j, "shared": j})
+                data.changed_keys()
+                if j % 100 == 0:
+                    data.reset(i)
+
+        run_threads(target)
+        assert data.changed_keys() == set(range(N_THREADS)) | {"shared"}
+        assert data["shared"] == N_LOOP - 1
+
+    def test_transaction(self):
+        data = rsdict_concurrent(dict(a=0, b=0))
+
+        def target(i):
+            for _ in range(N_LOOP // 10):
+                with data.transaction():
+                    a = data["a"]
+                    data["a"] = a + 1
+                    data["b"] = data["a"]
+
+        run_threads(target)
+        assert data["a"] == data["b"] == N_THREADS * (N_LOOP // 10)
+
+    def test_rollback_order(self):
+        n_keys = 200
+        data = rsdict_concurrent({i: i for i in range(n_keys)}, fixkey=False)
+        done = threading.Event()
+
+        def target(i):
+            if i < 3:
+                while not done.is_set():
+                    # keys not deleted are always readable
+                    for key in range(1, n_keys):
+                        assert data[key] == key
+                return None
+            try:
+                for _ in range(N_LOOP // 10):
+                    with pytest.raises(ValueError):
+                        with data.transaction():
+                            del data[0]
+                            data[0] = 0
+                            raise ValueError
+                    data.snapshot("a")
+                    del data[0]
+                    data[n_keys] = n_keys
+                    data.restore("a")
+            finally:
+                done.set()
+
+        run_threads(target, n=4)
+        assert data.to_dict() == {i: i for i in range(n_keys)}
+        # order of keys is not restored
+        assert list(data) == list(range(1, n_keys)) + [0]
+
+    def test_read_snapshot(self):
+        data = rsdict_concurrent(dict(a=0, b=[1], c="x"), fixkey=False)
+        with data.read_snapshot() as view:
+            assert type(view) is rsdict_view
+            data["a"] = 1
+            data["a"] = 2
+            data["d"] = 3
+            del data["c"]
+            data.update(b=[2])
+            with data.read_snapshot() as view2:
+                data["a"] = 4
+                data.reset("b")
+                assert view2.to_dict() == dict(a=2, b=[2], d=3)
+                assert view2.version > view.version
+            assert view.to_dict() == dict(a=0, b=[1], c="x")
+            assert list(view) == ["a", "b", "c"]
+            assert len(view) == 3
+            assert "d" not in view
+            with pytest.raises(KeyError):
+                view["d"]
+            assert view.get("d") is None
+            assert repr(view) == "rsdict_view({'a': 0, 'b': [1], 'c': 'x'})"
+            with pytest.raises(ValueError):
+                with data.transaction():
+                    data["a"] = 5
+                    data.popitem()
+                    raise ValueError
+            assert view["a"] == 0
+            data.clear()
+            assert view.to_dict() == dict(a=0, b=[1], c="x")
+        with pytest.raises(ValueError):
+            view["a"]
+        with pytest.raises(ValueError):
+            list(view)
+        # history is released
+        data["a"] = 1
+        with data.read_snapshot() as view:
+            assert view.to_dict() == dict(a=1)
+
+    def test_read_snapshot_history(self):
+        data = rsdict_concurrent(dict(a=0, b=0))
+
+        # overlapping snapshots (at least one is always open)
+        snapshots = list()
+        for i in range(1, 1001):
+            if i % 10 == 0:
+                context = data.read_snapshot()
+                snapshots.append((context, context.__enter__(), i - 1))
+            data["a"] = i
+            if len(snapshots) > 2:
+                context, view, expected = snapshots.pop(0)
+                assert view["a"] == expected
+                assert view["b"] == 0
+                context.__exit__(None, None, None)
+                history = data._rsdict_concurrent__versions.history
+                # values older than open snapshots are dropped
+                assert len(history["a"]) <= 30
+        for context, view, expected in snapshots:
+            assert view["a"] == expected
+            context.__exit__(None, None, None)
+        assert data._rsdict_concurrent__versions is None
+
+    def test_read_snapshot_threads(self):
+        n_keys = 20
+        data = rsdict_concurrent({i: 0 for i in range(n_keys)})
+
+        def target(i):
+            for j in range(N_LOOP // 10):
+                if i % 2:
+                    # write all keys with the same value
+                    data.update({k: j for k in range(n_keys)})
+                else:
+                    with data.read_snapshot() as view:
+                        values = [view[k] for k in range(n_keys)]
+                    assert len(set(values)) == 1
+
+        run_threads(target)
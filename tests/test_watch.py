@@ -0,0 +1,138 @@
+"""pytest
+
+Requirements:
+pip install -r requirements/test.txt
+Usage:
+pytest -vsl --cov=./src/rsdict --cov-report=term-missing
+"""
+import asyncio
+import threading
+
+import pytest
+
+from src.rsdict import rsdict, rsdict_concurrent, rsdict_watch
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+InitItems = {str(i): i for i in range(100)}
+
+
+class TestWatch(object):
+    def test_wait_changed(self):
+        data = rsdict(InitItems, fixkey=False)
+
+        async def main():
+            waiter_all = data.wait_changed()
+            waiter_0 = data.wait_changed(keys=["0"])
+            data["1"] = -1
+            data.update({str(i): -i for i in range(50, 100)})
+            data.reset("1")
+            assert not waiter_all.done()
+            assert await waiter_all == (
+                {"1"} | {str(i) for i in range(50, 100)})
+            await asyncio.sleep(0)
+            assert not waiter_0.done()
+            del data["0"]
+            assert await waiter_0 == {"0"}
+            # listener is removed
+            await asyncio.sleep(0)
+            with pytest.raises(ValueError):
+                data._remove_listener(None)
+            data["hoge"] = 1
+
+            waiter = asyncio.ensure_future(data.wait_changed())
+            await asyncio.sleep(0)
+            data.clear()
+            assert await waiter == (set(InitItems) | {"hoge"}) - {"0"}
+
+            # cancel
+            waiter = data.wait_changed()
+            waiter.cancel()
+            data["hoge"] = 2
+            await asyncio.sleep(0)
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        run(main())
+
+    def test_closed_loop(self):
+        data = rsdict(InitItems)
+
+        async def timeout():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(data.wait_changed(), 0.01)
+
+        async def pending():
+            data.wait_changed()
+            data.watch()
+
+        run(timeout())
+        # listener is removed with the waiter
+        assert data._rsdict__listeners is None
+        data["0"] = 1
+        # waiter and iterator left on the closed loop
+        run(pending())
+        data["0"] = 2
+        data["0"] = 3
+        assert data["0"] == 3
+        assert data._rsdict__listeners is None
+
+    def test_watch(self):
+        data = rsdict(InitItems)
+
+        async def consumer(changes, results):
+            async for keys in changes:
+                results.append(keys)
+
+        async def main():
+            results = list()
+            results_1 = list()
+            changes = data.watch()
+            assert type(changes) is rsdict_watch
+            with data.watch(keys=["1"]) as changes_1:
+                task = asyncio.ensure_future(consumer(changes, results))
+                task_1 = asyncio.ensure_future(consumer(changes_1, results_1))
+                await asyncio.sleep(0)
+                for i in range(10):
+                    data["0"] = i
+                data["2"] = 2
+                await asyncio.sleep(0)
+                data["1"] = 1
+                await asyncio.sleep(0)
+                await asyncio.sleep(0)
+            await task_1
+            # merged while busy
+            data["3"] = 3
+            data["4"] = 4
+            await asyncio.sleep(0)
+            data["5"] = 5
+            await asyncio.sleep(0)
+            changes.close()
+            changes.close()
+            await task
+            assert results == [{"0", "2"}, {"1"}, {"3", "4"}, {"5"}]
+            assert results_1 == [{"1"}]
+            with pytest.raises(StopAsyncIteration):
+                await changes.__anext__()
+
+        run(main())
+
+    def test_threads(self):
+        data = rsdict_concurrent(InitItems)
+
+        async def main():
+            waiter = data.wait_changed()
+            thread = threading.Thread(
+                target=lambda: data.update({"1": 2, "2": 3}))
+            thread.start()
+            assert await waiter == {"1", "2"}
+            thread.join()
+
+        run(main())
@@ -0,0 +1,53 @@
+"""Memory comparison test (vs dict)
+
+Usage:
+python tools/memory.py
+"""
+import sys
+import argparse
+import tracemalloc
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict, rsdict_frozen
+
+
+def measure(f, items, n) -> float:
+    """Returns: average size of an instance (bytes)"""
+    tracemalloc.start()
+    data = [f(items) for _ in range(n)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    return size / n
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=3)
+    parser.add_argument("--test", "-t", type=int, default=100000)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+
+    print(rsdict.__module__, __version__)
+    print("size={}, n_test={}".format(size, n_test))
+
+    items = dict()
+    for i in range(size):
+        items[str(i)] = i
+
+    size_d = measure(dict, items, n_test)
+    for f in [dict, rsdict, rsdict_frozen]:
+        size_f = measure(f, items, n_test)
+        print("{}: {:.0f} bytes (x{:.1f})".format(
+            f.__name__,
+            size_f,
+            size_f / size_d,
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -38,6 +38,7 @@ def measure(d, f, size, n) -> tuple:
             de = datetime.now()
             ts.append((de - ds).total_seconds())
     else:
+        updates = dict.fromkeys(d, 0.5)
         for _ in range(n):
             ds = datetime.now()
             if f == "get":
@@ -46,6 +47,8 @@ def measure(d, f, size, n) -> tuple:
             elif f == "set":
                 for k in d:
                     d[k] = 0.5
+            elif f == "update":
+                d.update(updates)
             else:
                 raise ValueError(f)
             de = datetime.now()
@@ -77,7 +80,7 @@ def main(argv) -> None:
         d_init[str(i)] = nums[i]
 
     results = list()
-    funcs = ["get", "set", "addkey", "delkey"]
+    funcs = ["get", "set", "update", "addkey", "delkey"]
     for f in funcs:
         if f in ["delkey"]:
             pass
@@ -0,0 +1,79 @@
+"""Speed test of cast (vs converting values before setting)
+
+Usage:
+python tools/speed_cast.py
+"""
+import sys
+import argparse
+import timeit
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--test", "-t", type=int, default=100000)
+
+    args = parser.parse_args()
+    n_test = args.test
+
+    print(rsdict.__module__, __version__)
+    print("n_test={}".format(n_test))
+
+    # config values from environment variables (strings)
+    items = dict(count=1, ratio=0.5, debug=False, path=Path("data"))
+    strings = dict(count="10", ratio="2.5", debug="false", path="/tmp/data")
+    converters = dict(
+        count=int,
+        ratio=float,
+        debug=lambda x: x.lower() == "true",
+        path=Path,
+    )
+    d = dict(items)
+    rd = rsdict(items, cast=True)
+    rd_nocast = rsdict(items)
+
+    for key, value in strings.items():
+        funcs = dict(
+            convert=lambda: d.__setitem__(key, converters[key](value)),
+            convert_rsdict=lambda: rd_nocast.__setitem__(
+                key, converters[key](value)),
+            cast=lambda: rd.__setitem__(key, value),
+        )
+        t_c = None
+        for name, f in funcs.items():
+            t = min(timeit.repeat(f, number=n_test, repeat=5)) / n_test
+            if t_c is None:
+                t_c = t
+            print("{} {}: {:.3f} us (x{:.2f})".format(
+                key,
+                name,
+                t * 1e6,
+                t / t_c,
+            ))
+
+    number = n_test // len(strings)
+    funcs = dict(
+        convert=lambda: d.update(
+            {k: converters[k](v) for k, v in strings.items()}),
+        convert_rsdict=lambda: rd_nocast.update(
+            {k: converters[k](v) for k, v in strings.items()}),
+        cast=lambda: rd.update(strings),
+    )
+    t_c = None
+    for name, f in funcs.items():
+        t = min(timeit.repeat(f, number=number, repeat=5)) / number
+        if t_c is None:
+            t_c = t
+        print("update {}: {:.3f} us (x{:.2f})".format(
+            name,
+            t * 1e6,
+            t / t_c,
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
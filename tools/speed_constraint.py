@@ -0,0 +1,62 @@
+"""Speed test of constraints (vs checking values before setting)
+
+Usage:
+python tools/speed_constraint.py
+"""
+import sys
+import argparse
+import timeit
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--test", "-t", type=int, default=100000)
+
+    args = parser.parse_args()
+    n_test = args.test
+
+    print(rsdict.__module__, __version__)
+    print("n_test={}".format(n_test))
+
+    items = dict(port=80, mode="a", free=0)
+    constraints = dict(
+        port=dict(min=1, max=65535),
+        mode=dict(choices=["a", "b", "c"]),
+    )
+    rd = rsdict(items)
+    rd_constrained = rsdict(items, constraints=constraints)
+
+    def wrapper(key, value):
+        if key == "port" and not 1 <= value <= 65535:
+            raise ValueError(value)
+        elif key == "mode" and value not in ("a", "b", "c"):
+            raise ValueError(value)
+        rd[key] = value
+
+    values = dict(port=8080, mode="b", free=1)
+    for key, value in values.items():
+        funcs = dict(
+            rsdict=lambda: rd.__setitem__(key, value),
+            wrapper=lambda: wrapper(key, value),
+            constraints=lambda: rd_constrained.__setitem__(key, value),
+        )
+        t_r = None
+        for name, f in funcs.items():
+            t = min(timeit.repeat(f, number=n_test, repeat=5)) / n_test
+            if t_r is None:
+                t_r = t
+            print("{} {}: {:.3f} us (x{:.2f})".format(
+                key,
+                name,
+                t * 1e6,
+                t / t_r,
+            ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,52 @@
+"""Construction speed comparison test (vs dict)
+
+Usage:
+python tools/speed_init.py
+"""
+import sys
+import argparse
+import timeit
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict, rsdict_template
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=20)
+    parser.add_argument("--test", "-t", type=int, default=10000)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+
+    print(rsdict.__module__, __version__)
+    print("size={}, n_test={}".format(size, n_test))
+
+    items = dict()
+    for i in range(size):
+        items[str(i)] = i if i % 2 else str(i)
+    items["list"] = ["a", "b"]
+    template = rsdict_template(items)
+
+    funcs = dict(
+        dict=lambda: dict(items),
+        rsdict=lambda: rsdict(items),
+        rsdict_template=lambda: template(),
+    )
+    t_d = None
+    for name, f in funcs.items():
+        t = min(timeit.repeat(f, number=n_test, repeat=5)) / n_test
+        if t_d is None:
+            t_d = t
+        print("{}: {:.0f} instances/s (x{:.1f})".format(
+            name,
+            1 / t,
+            t / t_d,
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
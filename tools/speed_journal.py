@@ -0,0 +1,62 @@
+"""Journal speed test (append and replay throughput)
+
+Usage:
+python tools/speed_journal.py
+"""
+import sys
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict_journal
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=1000)
+    parser.add_argument("--test", "-t", type=int, default=100000)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+
+    print(rsdict_journal.__module__, __version__)
+    print("size={}, n_test={}".format(size, n_test))
+
+    items = dict()
+    for i in range(size):
+        items[str(i)] = i
+    keys = list(items)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file = Path(tmpdir) / "data.journal"
+
+        with rsdict_journal(file, items) as journal:
+            data = journal.data
+            t = time.perf_counter()
+            for i in range(n_test):
+                data[keys[i % size]] = i
+            t = time.perf_counter() - t
+        print("append: {:.0f} records/s ({:.0f} bytes)".format(
+            n_test / t,
+            file.stat().st_size,
+        ))
+
+        t = time.perf_counter()
+        journal = rsdict_journal(file, items)
+        t = time.perf_counter() - t
+        journal.close()
+        print("replay: {:.0f} records/s".format(n_test / t))
+
+        with rsdict_journal(file, items) as journal:
+            t = time.perf_counter()
+            journal.compact()
+            t = time.perf_counter() - t
+        print("compact: {:.1f} ms".format(t * 1000))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,58 @@
+"""Load speed comparison test (vs json)
+
+Usage:
+python tools/speed_load.py
+"""
+import sys
+import json
+import argparse
+import tempfile
+import timeit
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict_frozen
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=100000)
+    parser.add_argument("--test", "-t", type=int, default=5)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+
+    print(rsdict_frozen.__module__, __version__)
+    print("size={}, n_test={}".format(size, n_test))
+
+    items = dict()
+    for i in range(size):
+        items[str(i)] = i if i % 2 else [str(i)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_json = Path(tmpdir) / "data.json"
+        file_rsdict = Path(tmpdir) / "data.rsdict"
+        file_json.write_text(json.dumps(items))
+        rsdict_frozen(items).save(file_rsdict)
+
+        funcs = dict(
+            json=lambda: rsdict_frozen(json.loads(file_json.read_text())),
+            load=lambda: rsdict_frozen.load(file_rsdict),
+            load_mmap=lambda: rsdict_frozen.load(file_rsdict, mmap=True),
+        )
+        t_j = None
+        for name, f in funcs.items():
+            t = min(timeit.repeat(f, number=n_test, repeat=3)) / n_test
+            if t_j is None:
+                t_j = t
+            print("{}: {:.1f} ms (x{:.2f})".format(
+                name,
+                t * 1000,
+                t / t_j,
+            ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
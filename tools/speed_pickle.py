@@ -0,0 +1,72 @@
+"""Pickle speed comparison test (vs dict)
+
+Usage:
+python tools/speed_pickle.py
+"""
+import sys
+import copy
+import pickle
+import argparse
+import timeit
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=100000)
+    parser.add_argument("--changed", "-c", type=float, default=0.01)
+    parser.add_argument("--test", "-t", type=int, default=5)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+
+    print(rsdict.__module__, __version__)
+    print("size={}, changed={}, n_test={}".format(size, args.changed, n_test))
+
+    items = dict()
+    for i in range(size):
+        items[str(i)] = i if i % 2 else [str(i)]
+    rd = rsdict(items)
+    for i in range(int(size * args.changed)):
+        rd[str(i)] = -i if i % 2 else [str(-i)]
+    d = rd.to_dict()
+    # pickling rsdict.to_dict() and initializing rsdict again
+    d_both = (dict(rd.get_initial()), d)
+
+    def roundtrip_dict():
+        initial, current = pickle.loads(pickle.dumps(d_both))
+        rd = rsdict(initial)
+        rd.update(current)
+        return rd
+
+    funcs = dict(
+        dict=lambda: pickle.loads(pickle.dumps(d)),
+        dict_rsdict=roundtrip_dict,
+        rsdict=lambda: pickle.loads(pickle.dumps(rd)),
+        deepcopy_dict=lambda: copy.deepcopy(d),
+        deepcopy_rsdict=lambda: copy.deepcopy(rd),
+    )
+    print("pickle size: dict={}, rsdict={}".format(
+        len(pickle.dumps(d_both)),
+        len(pickle.dumps(rd)),
+    ))
+    t_d = None
+    for name, f in funcs.items():
+        t = min(timeit.repeat(f, number=n_test, repeat=3)) / n_test
+        if t_d is None:
+            t_d = t
+        print("{}: {:.1f} ms (x{:.2f}, {:.0f} keys/s)".format(
+            name,
+            t * 1000,
+            t / t_d,
+            size / t,
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,71 @@
+"""Speed test of subscribe() (vs __setitem__ without subscribers)
+
+Usage:
+python tools/speed_subscribe.py
+"""
+import sys
+import argparse
+import timeit
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=1000)
+    parser.add_argument("--test", "-t", type=int, default=100000)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+
+    print(rsdict.__module__, __version__)
+    print("size={}, n_test={}".format(size, n_test))
+
+    items = dict()
+    for i in range(size):
+        items[str(i)] = i
+    updates = dict.fromkeys(items, 1)
+
+    def callback(rd, keys):
+        pass
+
+    data = dict(
+        dict=dict(items),
+        unsubscribed=rsdict(items),
+        subscribed=rsdict(items),
+        subscribed_keys=rsdict(items),
+        unsubscribed_again=rsdict(items),
+    )
+    data["subscribed"].subscribe(callback)
+    data["subscribed_keys"].subscribe(callback, keys=["0"])
+    data["unsubscribed_again"].subscribe(callback)
+    data["unsubscribed_again"].unsubscribe(callback)
+
+    for name in ["set", "update"]:
+        t_u = None
+        for key, d in data.items():
+            if name == "set":
+                def f():
+                    d["1"] = 1
+                number = n_test
+            else:
+                def f():
+                    d.update(updates)
+                number = n_test // size
+            t = min(timeit.repeat(f, number=number, repeat=5)) / number
+            if key == "unsubscribed":
+                t_u = t
+            print("{} {}: {:.3f} us{}".format(
+                name,
+                key,
+                t * 1e6,
+                "" if t_u is None else " (x{:.2f})".format(t / t_u),
+            ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,78 @@
+"""Multi-thread speed test of rsdict_concurrent (vs dict)
+
+Usage:
+python tools/speed_threads.py
+"""
+import sys
+import argparse
+import threading
+import time
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict_concurrent
+
+
+def measure(data, keys, n_threads: int, n_test: int, n_write: int) -> float:
+    """Returns: operations per second (1 write per n_write reads)"""
+    def target(i):
+        n_keys = len(keys)
+        for j in range(n_test):
+            key = keys[(i + j) % n_keys]
+            if j % n_write == 0:
+                data[key] = j
+            else:
+                data[key]
+
+    threads = [
+        threading.Thread(target=target, args=(i,)) for i in range(n_threads)
+    ]
+    t = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    t = time.perf_counter() - t
+    return n_threads * n_test / t
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=1000)
+    parser.add_argument("--test", "-t", type=int, default=100000)
+    parser.add_argument("--threads", "-n", type=int, default=4)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+    n_threads = args.threads
+
+    print(rsdict_concurrent.__module__, __version__)
+    print("size={}, n_test={}, threads={}, GIL={}".format(
+        size,
+        n_test,
+        n_threads,
+        getattr(sys, "_is_gil_enabled", lambda: True)(),
+    ))
+
+    items = dict()
+    for i in range(size):
+        items[str(i)] = i
+    keys = list(items)
+
+    for n_write in [1, 10, 100]:
+        ops_d = measure(dict(items), keys, n_threads, n_test, n_write)
+        ops = measure(
+            rsdict_concurrent(items), keys, n_threads, n_test, n_write)
+        print("1 write per {} ops: dict {:.0f} ops/s, "
+              "rsdict_concurrent {:.0f} ops/s (x{:.1f})".format(
+                  n_write,
+                  ops_d,
+                  ops,
+                  ops_d / ops,
+              ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
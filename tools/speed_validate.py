@@ -0,0 +1,74 @@
+"""Validation speed comparison test (template() and update() per dict)
+
+Usage:
+python tools/speed_validate.py
+"""
+import sys
+import argparse
+import timeit
+from pathlib import Path
+
+pkg_dir = Path(__file__).parents[1]
+sys.path.append(str(pkg_dir))
+from src.rsdict import __version__, rsdict_template
+
+
+def main(argv) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", "-s", type=int, default=100000)
+    parser.add_argument("--keys", "-k", type=int, default=20)
+    parser.add_argument("--workers", "-w", type=int, default=4)
+    parser.add_argument("--test", "-t", type=int, default=1)
+
+    args = parser.parse_args()
+    size = args.size
+    n_test = args.test
+
+    print(rsdict_template.__module__, __version__)
+    print("size={}, keys={}, workers={}, n_test={}".format(
+        size, args.keys, args.workers, n_test))
+
+    inititems = dict()
+    for i in range(args.keys):
+        inititems["key{}".format(i)] = i if i % 2 else str(i)
+    template = rsdict_template(inititems, cast=True)
+    items = list()
+    for i in range(size):
+        item = dict()
+        for j in range(0, args.keys, 3):
+            item["key{}".format(j)] = str(i) if j % 2 else i
+        items.append(item)
+
+    def update():
+        results = list()
+        for item in items:
+            try:
+                rd = template()
+                rd.update(item)
+            except Exception as e:
+                results.append(e)
+            else:
+                results.append(rd)
+        return results
+
+    funcs = dict(
+        update=update,
+        validate_many=lambda: list(template.validate_many(items)),
+        validate_many_workers=lambda: list(
+            template.validate_many(items, workers=args.workers)),
+    )
+    t_u = None
+    for name, f in funcs.items():
+        t = min(timeit.repeat(f, number=n_test, repeat=3)) / n_test
+        if t_u is None:
+            t_u = t
+        print("{}: {:.1f} ms (x{:.2f}, {:.0f} dicts/s)".format(
+            name,
+            t * 1000,
+            t / t_u,
+            size / t,
+        ))
+
+
+if __name__ == "__main__":
+    main(sys.argv)